@@ -1,22 +1,25 @@
 ﻿from flask import Flask, jsonify, send_from_directory, request 
 from flask_cors import CORS
-from datetime import timedelta, datetime
-from werkzeug.security import generate_password_hash
+from datetime import timedelta
 import os
 from app.extensions import mongo, bcrypt, mail, socketio
 
 
 from flask import Flask, jsonify, send_from_directory, request
 from flask_cors import CORS
-from datetime import timedelta, datetime
-from werkzeug.security import generate_password_hash
+from datetime import timedelta
 import os
 
 from app.extensions import mongo, bcrypt, mail, socketio
+from app.utils.json_provider import MongoJSONProvider
+from app.utils.query_stats import query_stats_listener, init_query_stats
+from app.utils.metrics import init_metrics
+from app.utils.jobs import init_jobs
 
 
 def create_app():
     app = Flask(__name__)
+    app.json = MongoJSONProvider(app)
 
     # ===============================
     # BASIC CONFIG
@@ -31,17 +34,13 @@ def create_app():
     # ===============================
     # INIT EXTENSIONS
     # ===============================
-    mongo.init_app(app)
-    
-    with app.app_context():
-        mongo.db.messages.create_index("chat_id")
-        mongo.db.messages.create_index("sender_id")
-        mongo.db.messages.create_index("read_at")
-        mongo.db.messages.create_index("delivered_at")
+    mongo.init_app(app, event_listeners=[query_stats_listener])
+    init_query_stats(app)
+    init_metrics(app)
+    init_jobs(app)
 
     bcrypt.init_app(app)
     mail.init_app(app)
-    print(app.url_map)
 
     socketio.init_app(
         app,
@@ -49,8 +48,12 @@ def create_app():
             "http://localhost:5173",
             "https://house-haunt.netlify.app",
         ],
+        **socketio_queue_options(os.getenv("SOCKETIO_MESSAGE_QUEUE")),
     )
 
+    # Registers the Socket.IO event handlers on the shared socketio instance
+    from app import sockets  # noqa: F401
+
     # ===============================
     # COOKIES
     # ===============================
@@ -113,6 +116,7 @@ def create_app():
         admin,
         haunter_chat,
         chat,
+        metrics,
     )
 
     blueprints = [
@@ -132,6 +136,7 @@ def create_app():
         admin.bp,
         haunter_chat.bp,
         chat.bp,
+        metrics.bp,
     ]
 
     for bp in blueprints:
@@ -140,9 +145,12 @@ def create_app():
     
 
     # ===============================
-    # DEFAULT ADMIN
+    # CLI COMMANDS
     # ===============================
-    create_default_admin(mongo)
+    # Indexes, validators and the default admin live in app/migrations.py and
+    # are applied by `flask db upgrade` at deploy time, not on worker boot.
+    from app.commands import register_commands
+    register_commands(app)
 
     # ===============================
     # HEALTH ROUTES
@@ -163,16 +171,18 @@ def create_app():
     return app
 
 
-def create_default_admin(mongo):
-    admin_email = "admin@househaunt.com"
+def socketio_queue_options(message_queue):
+    """
+    Cross-process fan-out for Socket.IO emits.
+
+    unix:///path/to.sock uses the in-repo broker (one host, many workers);
+    any other URL (redis://, amqp://) is handed to Flask-SocketIO as-is.
+    """
+    if not message_queue:
+        return {}
 
-    if mongo.db.users.find_one({"email": admin_email}):
-        return
+    if message_queue.startswith("unix://"):
+        from app.sockets.broker import UnixSocketManager
+        return {"client_manager": UnixSocketManager(message_queue[len("unix://"):])}
 
-    mongo.db.users.insert_one({
-        "username": "admin",
-        "email": admin_email,
-        "password": generate_password_hash("SuperSecret123!"),
-        "role": "admin",
-        "created_at": datetime.utcnow(),
-    })
+    return {"message_queue": message_queue}
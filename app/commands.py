@@ -0,0 +1,272 @@
+# app/commands.py
+import time
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from pymongo import UpdateOne
+
+from app.extensions import mongo
+from app.migrations import MIGRATIONS, applied_versions, upgrade
+from app.utils.chats import PREVIEW_LENGTH
+from app.utils.search import reindex_houses
+
+BATCH_SIZE = 500
+
+
+def flush(collection, ops):
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    return []
+
+
+# ===============================
+# MIGRATIONS
+# ===============================
+@click.group("db")
+def db_cli():
+    """Schema migrations (indexes, validators, seed data)."""
+
+
+@db_cli.command("upgrade")
+@with_appcontext
+def db_upgrade():
+    """Apply pending migrations; run once per deploy."""
+    applied = upgrade(mongo.db, echo=click.echo)
+    click.echo(f"Applied {applied} migration(s)" if applied else "Database is up to date")
+
+
+@db_cli.command("status")
+@with_appcontext
+def db_status():
+    """List migrations and whether each has been applied."""
+    applied = applied_versions(mongo.db)
+
+    for version, name, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+        state = "applied" if version in applied else "pending"
+        click.echo(f"{version:04d}_{name}  {state}")
+
+
+# ===============================
+# SEARCH
+# ===============================
+@click.command("reindex-search")
+@with_appcontext
+def reindex_search():
+    """Rebuild the stored search fields on every house."""
+    total = reindex_houses(mongo.db, batch_size=BATCH_SIZE)
+    click.echo(f"Reindexed {total} houses")
+
+
+# ===============================
+# RATINGS
+# ===============================
+@click.command("backfill-ratings")
+@with_appcontext
+def backfill_ratings():
+    """Recompute rating_sum/rating_count/rating_histogram on agents from reviews."""
+    from app.routes.review import parse_rating
+
+    totals = {}
+    skipped = 0
+
+    for row in mongo.db.reviews.aggregate([
+        {"$group": {
+            "_id": {"agent_id": "$agent_id", "rating": "$rating"},
+            "count": {"$sum": 1},
+        }},
+    ]):
+        agent_id = row["_id"]["agent_id"]
+        rating = row["_id"]["rating"]
+        agent = totals.setdefault(agent_id, {"rating_sum": 0, "rating_count": 0, "rating_histogram": {}})
+
+        # Same rule as new reviews; fractional legacy ratings are reported, not truncated
+        star = parse_rating(rating)
+        if star is None:
+            skipped += row["count"]
+            continue
+
+        agent["rating_sum"] += star * row["count"]
+        agent["rating_count"] += row["count"]
+        agent["rating_histogram"][str(star)] = agent["rating_histogram"].get(str(star), 0) + row["count"]
+
+    mongo.db.users.update_many(
+        {"role": "agent"},
+        {"$set": {"rating_sum": 0, "rating_count": 0, "rating_histogram": {}}}
+    )
+
+    ops = [UpdateOne({"_id": agent_id}, {"$set": fields}) for agent_id, fields in totals.items()]
+    for i in range(0, len(ops), BATCH_SIZE):
+        flush(mongo.db.users, ops[i:i + BATCH_SIZE])
+
+    click.echo(f"Backfilled ratings for {len(totals)} agents")
+    if skipped:
+        click.echo(f"Skipped {skipped} reviews with an invalid rating")
+
+
+# ===============================
+# CHATS
+# ===============================
+@click.command("backfill-chat-counters")
+@with_appcontext
+def backfill_chat_counters():
+    """Recompute unread_counts and last_message on every chat from messages."""
+    unread = {}
+    for row in mongo.db.messages.aggregate([
+        {"$match": {"read_at": None}},
+        {"$group": {
+            "_id": {"chat_id": "$chat_id", "sender_id": "$sender_id"},
+            "count": {"$sum": 1},
+        }},
+    ]):
+        unread[(row["_id"]["chat_id"], row["_id"]["sender_id"])] = row["count"]
+
+    last_messages = {
+        row["_id"]: row["message"]
+        for row in mongo.db.messages.aggregate([
+            {"$sort": {"chat_id": 1, "created_at": -1}},
+            {"$group": {"_id": "$chat_id", "message": {"$first": "$$ROOT"}}},
+        ], allowDiskUse=True)
+    }
+
+    chats = mongo.db.chats
+    ops = []
+    total = 0
+
+    for chat in chats.find({}, {"agent_id": 1, "haunter_id": 1, "created_at": 1}):
+        agent_id, haunter_id = chat.get("agent_id"), chat.get("haunter_id")
+        fields = {
+            # Messages sent by one participant are unread for the other
+            "unread_counts": {
+                str(agent_id): unread.get((chat["_id"], haunter_id), 0),
+                str(haunter_id): unread.get((chat["_id"], agent_id), 0),
+            },
+        }
+
+        message = last_messages.get(chat["_id"])
+        if message:
+            fields["last_message"] = {
+                "sender_id": message["sender_id"],
+                "content": message.get("content", "")[:PREVIEW_LENGTH],
+                "created_at": message.get("created_at"),
+            }
+            fields["last_message_at"] = message.get("created_at")
+        else:
+            fields["last_message_at"] = chat.get("created_at")
+
+        ops.append(UpdateOne({"_id": chat["_id"]}, {"$set": fields}))
+        total += 1
+
+        if len(ops) >= BATCH_SIZE:
+            ops = flush(chats, ops)
+
+    flush(chats, ops)
+    click.echo(f"Backfilled counters for {total} chats")
+
+
+# ===============================
+# NOTIFICATIONS
+# ===============================
+@click.command("backfill-notification-counters")
+@with_appcontext
+def backfill_notification_counters():
+    """Recompute every user's notifications_unread counter."""
+    from app.utils.notify import recount_unread_counters
+
+    total = recount_unread_counters(mongo.db, batch_size=BATCH_SIZE)
+    click.echo(f"Backfilled notification counters for {total} users")
+
+
+# ===============================
+# HAUNTER DASHBOARDS
+# ===============================
+@click.command("rebuild-haunter-dashboards")
+@click.option("--user-id", default=None, help="Rebuild a single haunter's dashboard.")
+@with_appcontext
+def rebuild_haunter_dashboards(user_id):
+    """Recompute haunter_dashboards read models from their source collections."""
+    from bson import ObjectId
+    from app.utils.haunter_dashboard import build_dashboard
+
+    if user_id:
+        ids = [ObjectId(user_id)]
+    else:
+        ids = (u["_id"] for u in mongo.db.users.find({"role": "haunter"}, {"_id": 1}))
+
+    total = 0
+    for haunter_id in ids:
+        build_dashboard(haunter_id)
+        total += 1
+
+    click.echo(f"Rebuilt {total} haunter dashboards")
+
+
+# ===============================
+# JOBS
+# ===============================
+@click.command("jobs-worker")
+@click.option("--workers", default=2, show_default=True, help="Worker threads.")
+@with_appcontext
+def jobs_worker(workers):
+    """Process background jobs in the foreground (alongside or instead of web workers)."""
+    from flask import current_app
+    from app.utils.jobs import JobWorkerPool
+
+    pool = JobWorkerPool(current_app._get_current_object(), workers=workers)
+    pool.start()
+    click.echo(f"Processing jobs with {workers} worker thread(s)")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+@click.command("jobs-retry-dead")
+@click.option("--name", default=None, help="Only requeue jobs with this name.")
+@with_appcontext
+def jobs_retry_dead(name):
+    """Requeue dead-lettered jobs with a fresh attempt budget."""
+    query = {"status": "dead"}
+    if name:
+        query["name"] = name
+
+    result = mongo.db.jobs.update_many(query, {"$set": {
+        "status": "queued",
+        "attempts": 0,
+        "run_at": datetime.utcnow(),
+    }})
+    click.echo(f"Requeued {result.modified_count} job(s)")
+
+
+# ===============================
+# SOCKET.IO BROKER
+# ===============================
+@click.command("socketio-broker")
+@click.option("--path", default="/tmp/househaunt-socketio.sock", show_default=True,
+              help="Unix socket path; workers use SOCKETIO_MESSAGE_QUEUE=unix://<path>.")
+def socketio_broker(path):
+    """Run the local Socket.IO fan-out broker in the foreground."""
+    from app.sockets.broker import UnixSocketBroker
+
+    broker = UnixSocketBroker(path)
+    broker.bind()
+    click.echo(f"Socket.IO broker listening on {path}")
+
+    try:
+        broker.serve_forever()
+    finally:
+        broker.close()
+
+
+def register_commands(app):
+    app.cli.add_command(db_cli)
+    app.cli.add_command(reindex_search)
+    app.cli.add_command(backfill_ratings)
+    app.cli.add_command(backfill_chat_counters)
+    app.cli.add_command(backfill_notification_counters)
+    app.cli.add_command(rebuild_haunter_dashboards)
+    app.cli.add_command(jobs_worker)
+    app.cli.add_command(jobs_retry_dead)
+    app.cli.add_command(socketio_broker)
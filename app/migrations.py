@@ -0,0 +1,381 @@
+# app/migrations.py
+"""
+Versioned MongoDB migrations: indexes, validators and seed data.
+
+Run once per deploy with `flask db upgrade`. Applied versions are recorded in
+the schema_migrations collection, so each migration runs at most once per
+database and workers never touch the schema at boot.
+
+Add new steps at the end with the next version number. Migrations should be
+safe to re-run (create_index is a no-op for an identical index), since a
+deploy that dies half-way will retry the unrecorded step.
+"""
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from werkzeug.security import generate_password_hash
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def decorator(fn):
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return decorator
+
+
+def applied_versions(db):
+    return {doc["_id"] for doc in db.schema_migrations.find({}, {"_id": 1})}
+
+
+def pending_migrations(db):
+    applied = applied_versions(db)
+    return [m for m in sorted(MIGRATIONS, key=lambda m: m[0]) if m[0] not in applied]
+
+
+def upgrade(db, echo=print):
+    """Apply every pending migration in version order; returns how many ran."""
+    pending = pending_migrations(db)
+
+    for version, name, fn in pending:
+        echo(f"Applying {version:04d}_{name}")
+        fn(db)
+        db.schema_migrations.insert_one({
+            "_id": version,
+            "name": name,
+            "applied_at": datetime.utcnow(),
+        })
+
+    return len(pending)
+
+
+def set_validator(db, collection, schema):
+    """
+    Attach a $jsonSchema validator, creating the collection if needed.
+
+    validationAction "warn" logs offending writes in the server log instead of
+    rejecting them, so schema drift never takes the API down.
+    """
+    options = {
+        "validator": {"$jsonSchema": schema},
+        "validationLevel": "moderate",
+        "validationAction": "warn",
+    }
+
+    if collection in db.list_collection_names():
+        db.command({"collMod": collection, **options})
+    else:
+        db.create_collection(collection, **options)
+
+
+# ===============================
+# 0001 BASELINE INDEXES
+# ===============================
+@migration(1, "baseline_indexes")
+def baseline_indexes(db):
+    # USERS
+    db.users.create_index([("email", ASCENDING)], unique=True)
+    db.users.create_index([("role", ASCENDING)])
+    db.users.create_index([("created_at", DESCENDING)])
+
+    # HOUSES
+    db.houses.create_index([("status", ASCENDING)])
+    db.houses.create_index([("agent_id", ASCENDING)])
+    db.houses.create_index([("created_at", DESCENDING)])
+    db.houses.create_index([("location", ASCENDING)])
+    db.houses.create_index([("price", ASCENDING)])
+    # Listing sorts: (status, sort field, _id) keeps keyset pages index-only
+    db.houses.create_index([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    db.houses.create_index([("status", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)])
+    # Listing search: multikey index over stored word prefixes
+    db.houses.create_index([("status", ASCENDING), ("search_prefixes", ASCENDING)])
+
+    # CONTACT REQUESTS
+    db.contact_requests.create_index([("haunter_id", ASCENDING)])
+    db.contact_requests.create_index([("agent_id", ASCENDING)])
+    db.contact_requests.create_index([("house_id", ASCENDING)])
+    db.contact_requests.create_index([("created_at", DESCENDING)])
+
+    # CHATS
+    db.chats.create_index([("agent_id", ASCENDING), ("created_at", DESCENDING)])
+    db.chats.create_index([("haunter_id", ASCENDING), ("created_at", DESCENDING)])
+
+    # MESSAGES
+    # History pages and catch-up both walk (chat_id, created_at, _id); the
+    # compound index also serves plain chat_id lookups.
+    db.messages.create_index([("chat_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)])
+    db.messages.create_index([("sender_id", ASCENDING)])
+    db.messages.create_index([("read_at", ASCENDING)])
+    db.messages.create_index([("delivered_at", ASCENDING)])
+
+    # FAVORITES
+    db.favorites.create_index([("haunter_id", ASCENDING)])
+    db.favorites.create_index([("house_id", ASCENDING)])
+
+    # REVIEWS
+    db.reviews.create_index([("agent_id", ASCENDING)])
+    db.reviews.create_index([("reviewer_id", ASCENDING)])
+    db.reviews.create_index([("created_at", DESCENDING)])
+
+    # KYC
+    db.kyc.create_index([("agent_id", ASCENDING)])
+    db.kyc.create_index([("status", ASCENDING)])
+
+    # NOTIFICATIONS
+    db.notifications.create_index([("user_id", ASCENDING)])
+    db.notifications.create_index([("is_read", ASCENDING)])
+    db.notifications.create_index([("created_at", DESCENDING)])
+
+    # WALLET
+    db.wallets.create_index([("user_id", ASCENDING)], unique=True)
+
+    # TRANSACTIONS
+    db.transactions.create_index([("user_id", ASCENDING)])
+    db.transactions.create_index([("created_at", DESCENDING)])
+
+
+# ===============================
+# 0002 VALIDATORS
+# ===============================
+@migration(2, "collection_validators")
+def collection_validators(db):
+    set_validator(db, "users", {
+        "bsonType": "object",
+        "required": ["email", "role", "created_at"],
+        "properties": {
+            "email": {"bsonType": "string"},
+            "role": {"bsonType": "string"},
+            "created_at": {"bsonType": "date"},
+        },
+    })
+
+    set_validator(db, "houses", {
+        "bsonType": "object",
+        "required": ["title", "agent_id", "location", "price", "created_at"],
+        "properties": {
+            "title": {"bsonType": "string"},
+            "agent_id": {"bsonType": "objectId"},
+            "location": {"bsonType": "string"},
+            "price": {"bsonType": "number"},
+            "status": {"bsonType": "string"},
+            "created_at": {"bsonType": "date"},
+        },
+    })
+
+    set_validator(db, "contact_requests", {
+        "bsonType": "object",
+        "required": ["haunter_id", "agent_id", "house_id", "created_at"],
+        "properties": {
+            "haunter_id": {"bsonType": "objectId"},
+            "agent_id": {"bsonType": "objectId"},
+            "house_id": {"bsonType": "objectId"},
+            "status": {"bsonType": "string"},
+            "created_at": {"bsonType": "date"},
+        },
+    })
+
+    set_validator(db, "favorites", {
+        "bsonType": "object",
+        "required": ["haunter_id", "house_id"],
+        "properties": {
+            "haunter_id": {"bsonType": "objectId"},
+            "house_id": {"bsonType": "objectId"},
+            "created_at": {"bsonType": "date"},
+        },
+    })
+
+    set_validator(db, "reviews", {
+        "bsonType": "object",
+        "required": ["agent_id", "reviewer_id", "rating", "created_at"],
+        "properties": {
+            "agent_id": {"bsonType": "objectId"},
+            "reviewer_id": {"bsonType": "objectId"},
+            "rating": {"bsonType": "int", "minimum": 1, "maximum": 5},
+            "comment": {"bsonType": ["string", "null"]},
+            "is_flagged": {"bsonType": "bool"},
+            "created_at": {"bsonType": "date"},
+        },
+    })
+
+    set_validator(db, "wallets", {
+        "bsonType": "object",
+        "required": ["user_id", "balance", "updated_at"],
+        "properties": {
+            "user_id": {"bsonType": "objectId"},
+            "balance": {"bsonType": "number"},
+            "updated_at": {"bsonType": "date"},
+        },
+    })
+
+
+# ===============================
+# 0003 DEFAULT ADMIN
+# ===============================
+@migration(3, "default_admin")
+def default_admin(db):
+    admin_email = "admin@househaunt.com"
+
+    if db.users.find_one({"email": admin_email}):
+        return
+
+    db.users.insert_one({
+        "username": "admin",
+        "email": admin_email,
+        "password": generate_password_hash("SuperSecret123!"),
+        "role": "admin",
+        "created_at": datetime.utcnow(),
+    })
+
+
+# ===============================
+# 0004 JOB QUEUE
+# ===============================
+@migration(4, "job_queue_indexes")
+def job_queue_indexes(db):
+    # Workers claim by (status, run_at); expired leases by locked_until
+    db.jobs.create_index([("status", ASCENDING), ("run_at", ASCENDING)])
+    db.jobs.create_index([("status", ASCENDING), ("locked_until", ASCENDING)])
+    db.jobs.create_index(
+        [("idempotency_key", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"idempotency_key": {"$type": "string"}},
+    )
+    # Finished jobs are kept for a week, then expire; dead jobs stay
+    db.jobs.create_index(
+        [("finished_at", ASCENDING)],
+        expireAfterSeconds=7 * 24 * 3600,
+        partialFilterExpression={"status": "done"},
+    )
+
+
+# ===============================
+# 0005 FAVORITE COUNTS
+# ===============================
+@migration(5, "favorite_counts")
+def favorite_counts(db):
+    # Drop duplicate favorites (keeping the oldest) so the unique index builds
+    duplicates = db.favorites.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {"haunter_id": "$haunter_id", "house_id": "$house_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+
+    for group in duplicates:
+        db.favorites.delete_many({"_id": {"$in": group["ids"][1:]}})
+
+    db.favorites.create_index(
+        [("haunter_id", ASCENDING), ("house_id", ASCENDING)], unique=True
+    )
+    # The compound index covers haunter_id lookups on its own
+    if "haunter_id_1" in db.favorites.index_information():
+        db.favorites.drop_index("haunter_id_1")
+
+    db.houses.update_many({}, {"$set": {"favorite_count": 0}})
+    ops = [
+        UpdateOne({"_id": row["_id"]}, {"$set": {"favorite_count": row["count"]}})
+        for row in db.favorites.aggregate([
+            {"$group": {"_id": "$house_id", "count": {"$sum": 1}}},
+        ])
+    ]
+    for i in range(0, len(ops), 500):
+        db.houses.bulk_write(ops[i:i + 500], ordered=False)
+
+    # "popular" listing sort
+    db.houses.create_index([("status", ASCENDING), ("favorite_count", DESCENDING), ("_id", DESCENDING)])
+
+
+# ===============================
+# 0006 CONTACT REQUEST INBOX
+# ===============================
+@migration(6, "contact_request_inbox")
+def contact_request_inbox(db):
+    # Agent inbox pages, with and without a status filter
+    db.contact_requests.create_index([("agent_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    db.contact_requests.create_index([
+        ("agent_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING),
+    ])
+
+    db.counters.update_many({}, {"$set": {"contact_requests_pending": 0}})
+    ops = [
+        UpdateOne({"_id": row["_id"]}, {"$set": {"contact_requests_pending": row["count"]}}, upsert=True)
+        for row in db.contact_requests.aggregate([
+            {"$match": {"status": "pending"}},
+            {"$group": {"_id": "$agent_id", "count": {"$sum": 1}}},
+        ])
+    ]
+    for i in range(0, len(ops), 500):
+        db.counters.bulk_write(ops[i:i + 500], ordered=False)
+
+
+# ===============================
+# 0007 HAUNTER DASHBOARDS
+# ===============================
+@migration(7, "haunter_dashboards")
+def haunter_dashboards(db):
+    # Dashboard builds read a haunter's requests and reviews newest first
+    db.contact_requests.create_index([("haunter_id", ASCENDING), ("created_at", DESCENDING)])
+    db.reviews.create_index([("reviewer_id", ASCENDING), ("created_at", DESCENDING)])
+    # House edits refresh the denormalised copies in every dashboard
+    db.haunter_dashboards.create_index([("recent_requests.house_id", ASCENDING)])
+
+
+# ===============================
+# 0008 AGENT HOUSE PAGES
+# ===============================
+@migration(8, "agent_house_pages")
+def agent_house_pages(db):
+    # /api/agent/my-houses pages newest first
+    db.houses.create_index([("agent_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+
+
+# ===============================
+# 0009 NOTIFICATION UNREAD COUNTERS
+# ===============================
+@migration(9, "notification_unread_counters")
+def notification_unread_counters(db):
+    # Every $inc upsert creates the field, after which the read path trusts it;
+    # seed it from the real unread count first so pre-existing unread
+    # notifications aren't lost from the badge.
+    from app.utils.notify import recount_unread_counters
+
+    recount_unread_counters(db)
+
+
+# ===============================
+# 0010 NOTIFICATION PAGES
+# ===============================
+@migration(10, "notification_pages")
+def notification_pages(db):
+    # /api/notifications/ pages a user's history newest first
+    db.notifications.create_index([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+
+
+# ===============================
+# 0011 HOUSE SEARCH FIELDS
+# ===============================
+@migration(11, "house_search_fields")
+def house_search_fields(db):
+    # Houses stored before search_prefixes existed never match a search
+    from app.utils.search import reindex_houses
+
+    reindex_houses(db)
+
+
+# ===============================
+# 0012 CHAT INBOX ORDER
+# ===============================
+@migration(12, "chat_inbox_order")
+def chat_inbox_order(db):
+    # Chat lists sort by last activity; chats with no messages yet rank by
+    # when they were opened
+    db.chats.update_many(
+        {"last_message_at": {"$exists": False}},
+        [{"$set": {"last_message_at": "$created_at"}}],
+    )
+    db.chats.create_index([("agent_id", ASCENDING), ("last_message_at", DESCENDING), ("_id", DESCENDING)])
+    db.chats.create_index([("haunter_id", ASCENDING), ("last_message_at", DESCENDING), ("_id", DESCENDING)])
@@ -2,6 +2,8 @@
 from datetime import datetime
 from flask import current_app
 from bson import ObjectId
+from app.utils.auth_helpers import invalidate_user
+from app.utils.search import search_fields
 
 def get_collection(name):
     """Get a MongoDB collection safely."""
@@ -39,7 +41,9 @@ class User:
         oid = to_objectid(user_id)
         if not oid:
             return None
-        return get_collection(User.collection).update_one({"_id": oid}, {"$set": updates})
+        result = get_collection(User.collection).update_one({"_id": oid}, {"$set": updates})
+        invalidate_user(oid)
+        return result
 
 # ==========================================================
 # HOUSE MODEL
@@ -51,6 +55,8 @@ class House:
     def create(data):
         data["created_at"] = datetime.utcnow()
         data["status"] = data.get("status", "pending")
+        data.setdefault("favorite_count", 0)
+        data.update(search_fields(data.get("title"), data.get("location"), data.get("description")))
         return get_collection(House.collection).insert_one(data)
 
     @staticmethod
@@ -91,12 +97,21 @@ class Favorite:
     @staticmethod
     def toggle(haunter_id, house_id):
         coll = get_collection(Favorite.collection)
-        existing = coll.find_one({"haunter_id": haunter_id, "house_id": house_id})
+        houses = get_collection("houses")
+        existing = coll.find_one_and_delete({"haunter_id": haunter_id, "house_id": house_id})
         if existing:
-            coll.delete_one({"_id": existing["_id"]})
+            houses.update_one(
+                {"_id": house_id, "favorite_count": {"$gt": 0}},
+                {"$inc": {"favorite_count": -1}},
+            )
             return {"message": "Removed from favorites"}
-        doc = {"haunter_id": haunter_id, "house_id": house_id, "created_at": datetime.utcnow()}
-        coll.insert_one(doc)
+        result = coll.update_one(
+            {"haunter_id": haunter_id, "house_id": house_id},
+            {"$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        if result.upserted_id is not None:
+            houses.update_one({"_id": house_id}, {"$inc": {"favorite_count": 1}})
         return {"message": "Added to favorites"}
 
     @staticmethod
@@ -14,6 +14,7 @@ from . import static_files
 from . import admin
 from . import haunter_chat
 from . import chat  
+from . import metrics
 
 
 __all__ = [
@@ -33,5 +34,6 @@ __all__ = [
     "admin",
     "haunter_chat",
     "chat",
+    "metrics",
 ]
 
@@ -3,7 +3,10 @@ from flask import Blueprint, jsonify, request, redirect
 from bson import ObjectId
 from datetime import datetime
 from app.extensions import mongo
-from app.utils.auth_helpers import jwt_required, admin_required, role_required 
+from app.utils.auth_helpers import jwt_required, admin_required, role_required, user_cache
+from app.utils.query_stats import query_budget
+from app.utils.cache import listing_cache, agent_dashboard_cache
+from app.utils.search import SEARCH_PROJECTION
 import os
 from flask import send_from_directory, g
 
@@ -27,51 +30,75 @@ def serialize_user(user):
     }
 
 
+def count_by(collection, field):
+    """{value: count} for one field, grouped in Mongo so no documents reach the worker."""
+    return {
+        row["_id"]: row["count"]
+        for row in collection.aggregate([
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        ])
+    }
+
+
 # ============================================================
 # ADMIN DASHBOARD (OVERVIEW)
 # ============================================================
 
 @bp.route("/dashboard", methods=["GET"])
+@query_budget(8)
 @jwt_required()
 @admin_required
 def admin_dashboard():
-    users = list(mongo.db.users.find({}))
-    houses = list(mongo.db.houses.find({}))
-    reviews = list(mongo.db.reviews.find({}))
-    kycs = list(mongo.db.kyc.find({}))
-    contact_requests = list(mongo.db.contact_requests.find({}))
-
-    agents = [u for u in users if u.get("role") == "agent"]
-    haunters = [u for u in users if u.get("role") == "haunter"]
-
-    avg_rating = (
-        round(sum(r.get("rating", 0) for r in reviews) / len(reviews), 2)
-        if reviews else 0
-    )
+    roles = count_by(mongo.db.users, "role")
+    kyc_statuses = count_by(mongo.db.kyc, "status")
+    house_statuses = count_by(mongo.db.houses, "status")
+
+    rating_stats = next(mongo.db.reviews.aggregate([
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "average": {"$avg": "$rating"},
+        }},
+    ]), None)
 
     return jsonify({
         "summary": {
-            "total_users": len(users),
-            "total_agents": len(agents),
-            "total_haunters": len(haunters),
+            "total_users": sum(roles.values()),
+            "total_agents": roles.get("agent", 0),
+            "total_haunters": roles.get("haunter", 0),
         },
         "kyc": {
-            "total": len(kycs),
-            "pending": sum(1 for k in kycs if k.get("status") == "pending"),
-            "approved": sum(1 for k in kycs if k.get("status") == "approved"),
-            "rejected": sum(1 for k in kycs if k.get("status") == "rejected"),
+            "total": sum(kyc_statuses.values()),
+            "pending": kyc_statuses.get("pending", 0),
+            "approved": kyc_statuses.get("approved", 0),
+            "rejected": kyc_statuses.get("rejected", 0),
         },
         "properties": {
-            "total": len(houses),
-            "pending": sum(1 for h in houses if h.get("status") == "pending"),
-            "approved": sum(1 for h in houses if h.get("status") == "approved"),
-            "rejected": sum(1 for h in houses if h.get("status") == "rejected"),
+            "total": sum(house_statuses.values()),
+            "pending": house_statuses.get("pending", 0),
+            "approved": house_statuses.get("approved", 0),
+            "rejected": house_statuses.get("rejected", 0),
         },
         "reviews": {
-            "total": len(reviews),
-            "average_rating": avg_rating,
+            "total": rating_stats["total"] if rating_stats else 0,
+            "average_rating": round(rating_stats["average"] or 0, 2) if rating_stats else 0,
         },
-        "contact_requests": len(contact_requests),
+        "contact_requests": mongo.db.contact_requests.estimated_document_count(),
+    }), 200
+
+
+# ============================================================
+# CACHE STATS
+# ============================================================
+
+@bp.route("/cache-stats", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def cache_stats():
+    return jsonify({
+        "user_cache": user_cache.stats(),
+        "listing_cache": listing_cache.stats(),
+        "agent_dashboard_cache": agent_dashboard_cache.stats(),
     }), 200
 
 
@@ -83,7 +110,7 @@ def admin_dashboard():
 @jwt_required()
 @admin_required
 def get_all_houses():
-    houses = list(mongo.db.houses.find({}))
+    houses = list(mongo.db.houses.find({}, SEARCH_PROJECTION))
     agents = {
         a["_id"]: a
         for a in mongo.db.users.find({"role": "agent"})
@@ -127,7 +154,7 @@ def review_house(house_id):
     if decision not in ("approved", "rejected"):
         return jsonify({"error": "decision must be approved or rejected"}), 400
 
-    house = mongo.db.houses.find_one({"_id": ObjectId(house_id)})
+    house = mongo.db.houses.find_one({"_id": ObjectId(house_id)}, SEARCH_PROJECTION)
     if not house:
         return jsonify({"error": "House not found"}), 404
 
@@ -138,6 +165,8 @@ def review_house(house_id):
             "reviewed_at": datetime.utcnow(),
         }}
     )
+    listing_cache.invalidate_tag("houses")
+    agent_dashboard_cache.delete(str(house.get("agent_id")))
 
     return jsonify({
         "message": f"House '{house.get('title')}' has been {decision}"
@@ -240,7 +269,7 @@ def get_users_by_role(role):
 @jwt_required()
 @admin_required
 def get_pending_houses():
-    houses = list(mongo.db.houses.find({"status": "pending"}))
+    houses = list(mongo.db.houses.find({"status": "pending"}, SEARCH_PROJECTION))
 
     agents = {
         a["_id"]: a
@@ -297,6 +326,7 @@ def review_kyc(kyc_id):
             "reviewed_at": datetime.utcnow(),
         }}
     )
+    agent_dashboard_cache.delete(str(record.get("agent_id")))
 
     return jsonify({
         "message": f"KYC has been {decision}"
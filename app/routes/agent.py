@@ -2,10 +2,16 @@ from flask import Blueprint, jsonify, request, g
 from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
+from pymongo import DESCENDING
 
 from app.extensions import mongo
 from app.utils.auth_helpers import jwt_required, role_required
-from app.utils.image_uploader import upload_house_image
+from app.utils.cache import listing_cache, agent_dashboard_cache
+from app.utils.image_uploader import upload_house_images
+from app.utils.pagination import parse_limit, encode_cursor, decode_cursor, keyset_filter
+from app.utils.query_stats import query_budget
+from app.utils.search import search_fields, SEARCH_PROJECTION
+from app.utils.haunter_dashboard import record_house_deleted, record_house_update
 
 bp = Blueprint("agent", __name__, url_prefix="/api/agent")
 
@@ -55,16 +61,19 @@ def create_house():
     if "images" not in request.files:
         return jsonify({"error": "At least one image is required"}), 400
 
-    files = request.files.getlist("images")
-    image_urls = []
+    files = [f for f in request.files.getlist("images") if f and allowed_file(f.filename)]
 
-    for file in files:
-        if file and allowed_file(file.filename):
-            public_id = f"{user['_id']}_{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
-            image_urls.append(upload_house_image(file, public_id))
+    if not files:
+        return jsonify({"error": "Invalid image types"}), 400
+
+    public_id = f"{user['_id']}_{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
+    image_urls, failed_uploads = upload_house_images(files, public_id)
 
     if not image_urls:
-        return jsonify({"error": "Invalid image types"}), 400
+        return jsonify({
+            "error": "Image upload failed",
+            "failed_uploads": failed_uploads,
+        }), 502
 
     house = {
         "agent_id": user["_id"],
@@ -75,13 +84,18 @@ def create_house():
         "images": image_urls,
         "created_at": datetime.utcnow(),
         "status": "pending",
+        "favorite_count": 0,
+        **search_fields(title, location, description),
     }
 
     result = mongo.db.houses.insert_one(house)
+    listing_cache.invalidate_tag("houses")
+    agent_dashboard_cache.delete(str(g.user["_id"]))
 
     return jsonify({
         "message": "House created successfully",
         "house_id": str(result.inserted_id),
+        "failed_uploads": failed_uploads,
     }), 201
 
 
@@ -89,10 +103,37 @@ def create_house():
 # MY HOUSES
 # ===============================
 @bp.route("/my-houses", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 @role_required("agent")
 def my_houses():
-    houses = mongo.db.houses.find({"agent_id": g.user["_id"]})
+    limit = parse_limit(request.args.get("limit"))
+    query = {"agent_id": g.user["_id"]}
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor, kind="my_houses")
+        if position is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        query["$and"] = [
+            keyset_filter("created_at", DESCENDING, position["value"], position["id"])
+        ]
+
+    # Served by the (agent_id, created_at, _id) index
+    houses = list(
+        mongo.db.houses.find(query, SEARCH_PROJECTION)
+        .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(houses) > limit:
+        houses = houses[:limit]
+        next_cursor = encode_cursor({
+            "kind": "my_houses",
+            "value": houses[-1].get("created_at"),
+            "id": houses[-1]["_id"],
+        })
 
     results = []
     for h in houses:
@@ -101,7 +142,7 @@ def my_houses():
         h.pop("_id", None)
         results.append(h)
 
-    return jsonify({"houses": results}), 200
+    return jsonify({"houses": results, "next_cursor": next_cursor, "limit": limit}), 200
 
 
 # ===============================
@@ -118,7 +159,7 @@ def edit_house(house_id):
     house = mongo.db.houses.find_one({
         "_id": oid,
         "agent_id": g.user["_id"],
-    })
+    }, SEARCH_PROJECTION)
 
     if not house:
         return jsonify({"error": "House not found"}), 404
@@ -129,20 +170,29 @@ def edit_house(house_id):
         "location": request.form.get("location", house["location"]),
         "price": float(request.form.get("price", house["price"])),
     }
+    updates.update(search_fields(
+        updates["title"], updates["location"], updates["description"]
+    ))
+
+    failed_uploads = []
 
     if "images" in request.files:
-        new_images = []
-        for file in request.files.getlist("images"):
-            if file and allowed_file(file.filename):
-                public_id = f"{g.user['_id']}_{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
-                new_images.append(upload_house_image(file, public_id))
+        files = [f for f in request.files.getlist("images") if f and allowed_file(f.filename)]
+        public_id = f"{g.user['_id']}_{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
+        new_images, failed_uploads = upload_house_images(files, public_id)
 
         if new_images:
             updates["images"] = house.get("images", []) + new_images
 
     mongo.db.houses.update_one({"_id": oid}, {"$set": updates})
+    listing_cache.invalidate_tag("houses")
+    agent_dashboard_cache.delete(str(g.user["_id"]))
+    record_house_update({"_id": oid, **updates})
 
-    return jsonify({"message": "House updated"}), 200
+    return jsonify({
+        "message": "House updated",
+        "failed_uploads": failed_uploads,
+    }), 200
 
 
 # ===============================
@@ -164,34 +214,98 @@ def delete_house(house_id):
     if result.deleted_count == 0:
         return jsonify({"error": "House not found"}), 404
 
+    record_house_deleted(oid)
+    listing_cache.invalidate_tag("houses")
+    agent_dashboard_cache.delete(str(g.user["_id"]))
+
     return jsonify({"message": "House deleted"}), 200
 
 
 # ===============================
 # GET CONTACT REQUESTS
 # ===============================
+CONTACT_REQUEST_STATUSES = ("pending", "accepted", "rejected")
+
+
+def get_pending_count(agent_id):
+    counters = mongo.db.counters.find_one({"_id": agent_id}, {"contact_requests_pending": 1})
+
+    if counters is None or "contact_requests_pending" not in counters:
+        # First read for an agent whose counter predates the backfill
+        pending = mongo.db.contact_requests.count_documents({"agent_id": agent_id, "status": "pending"})
+        mongo.db.counters.update_one(
+            {"_id": agent_id},
+            {"$set": {"contact_requests_pending": pending}},
+            upsert=True,
+        )
+        return pending
+
+    return max(0, counters["contact_requests_pending"])
+
+
 @bp.route("/contact-requests", methods=["GET"])
+@query_budget(3)
 @jwt_required()
 @role_required("agent")
 def get_contact_requests():
     agent_id = g.user["_id"]
-
-    requests = mongo.db.contact_requests.find(
-        {"agent_id": agent_id}
-    ).sort("created_at", -1)
+    status = request.args.get("status")
+    limit = parse_limit(request.args.get("limit"))
+
+    if status is not None and status not in CONTACT_REQUEST_STATUSES:
+        options = ", ".join(CONTACT_REQUEST_STATUSES)
+        return jsonify({"error": f"status must be one of {options}"}), 400
+
+    # Served by (agent_id, created_at, _id) or (agent_id, status, created_at, _id)
+    match = {"agent_id": agent_id}
+    if status:
+        match["status"] = status
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor, kind="contact_requests", status=status)
+        if position is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        match["$and"] = [
+            keyset_filter("created_at", DESCENDING, position["value"], position["id"])
+        ]
+
+    requests = list(mongo.db.contact_requests.aggregate([
+        {"$match": match},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$lookup": {
+            "from": "users",
+            "localField": "haunter_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"username": 1, "email": 1}}],
+            "as": "haunter",
+        }},
+        {"$lookup": {
+            "from": "houses",
+            "localField": "house_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"title": 1, "location": 1, "price": 1}}],
+            "as": "house",
+        }},
+    ]))
+
+    next_cursor = None
+    if len(requests) > limit:
+        requests = requests[:limit]
+        last = requests[-1]
+        next_cursor = encode_cursor({
+            "kind": "contact_requests",
+            "status": status,
+            "value": last.get("created_at"),
+            "id": last["_id"],
+        })
 
     results = []
 
     for req in requests:
-        haunter = mongo.db.users.find_one(
-            {"_id": req["haunter_id"]},
-            {"password": 0}
-        )
-
-        house = mongo.db.houses.find_one(
-            {"_id": req["house_id"]},
-            {"title": 1, "location": 1, "price": 1}
-        )
+        haunter = req["haunter"][0] if req["haunter"] else None
+        house = req["house"][0] if req["house"] else None
 
         results.append({
             "request_id": str(req["_id"]),
@@ -211,11 +325,21 @@ def get_contact_requests():
         })
 
     return jsonify({
-        "total_requests": len(results),
-        "requests": results
+        "total_requests": len(results),  # on this page
+        "requests": results,
+        "next_cursor": next_cursor,
+        "limit": limit,
     }), 200
 
 
+@bp.route("/contact-requests/pending-count", methods=["GET"])
+@query_budget(4)
+@jwt_required()
+@role_required("agent")
+def get_contact_requests_pending_count():
+    return jsonify({"pending": get_pending_count(g.user["_id"])}), 200
+
+
 # ===============================
 # DECIDE CONTACT REQUEST
 # ===============================
@@ -233,34 +357,45 @@ def decide_contact_request(request_id):
     if decision not in ("accepted", "rejected"):
         return jsonify({"error": "Decision must be accepted or rejected"}), 400
 
-    contact_request = mongo.db.contact_requests.find_one({
-        "_id": oid,
-        "agent_id": g.user["_id"],
-    })
+    # Only an undecided request matches, so two concurrent decisions can't
+    # both win (or both decrement the pending counter)
+    contact_request = mongo.db.contact_requests.find_one_and_update(
+        {
+            "_id": oid,
+            "agent_id": g.user["_id"],
+            "status": {"$nin": ["accepted", "rejected"]},
+        },
+        {"$set": {
+            "status": decision,
+            "responded_at": datetime.utcnow(),
+        }},
+        projection={"haunter_id": 1},
+    )
 
     if not contact_request:
+        if mongo.db.contact_requests.find_one({"_id": oid, "agent_id": g.user["_id"]}, {"_id": 1}):
+            return jsonify({"error": "Request already decided"}), 409
         return jsonify({"error": "Contact request not found"}), 404
 
-    if contact_request.get("status") in ("accepted", "rejected"):
-        return jsonify({"error": "Request already decided"}), 409
-
-    mongo.db.contact_requests.update_one(
-        {"_id": oid},
-        {"$set": {
-            "status": decision,
-            "responded_at": datetime.utcnow(),
-        }}
+    mongo.db.counters.update_one(
+        {"_id": g.user["_id"], "contact_requests_pending": {"$gt": 0}},
+        {"$inc": {"contact_requests_pending": -1}},
     )
 
     if decision == "accepted":
         if not mongo.db.chats.find_one({"contact_request_id": oid}):
+            now = datetime.utcnow()
             mongo.db.chats.insert_one({
                 "contact_request_id": oid,
                 "agent_id": g.user["_id"],
                 "haunter_id": contact_request["haunter_id"],
-                "created_at": datetime.utcnow(),
+                "created_at": now,
+                # Inbox order; a new chat ranks by when it opened until its first message
+                "last_message_at": now,
             })
 
+    agent_dashboard_cache.delete(str(g.user["_id"]))
+
     return jsonify({"message": f"Contact request {decision}"}), 200
 
 
@@ -3,16 +3,21 @@ from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 from datetime import datetime, timedelta
 from app.extensions import mongo, mail
-from app.utils.auth_helpers import jwt_required
+from app.utils.auth_helpers import jwt_required, invalidate_user
+from app.utils.email_utils import send_resend_email
 import os
 import secrets
-import requests
+import time
 
 bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 
+# Repeated forgot-password requests inside one window queue a single email;
+# its link stays valid for the full 30 minutes
+RESET_EMAIL_WINDOW = 300  # seconds
+
 if not SECRET_KEY:
     raise RuntimeError("SECRET_KEY environment variable not set")
 
@@ -165,36 +170,25 @@ def forgot_password():
 
         reset_link = f"{frontend_url}/reset-password/{token}"
 
-        response = requests.post(
-            "https://api.resend.com/emails",
-            headers={
-                "Authorization": f"Bearer {resend_api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "from": "onboarding@resend.dev",
-                "to": [email],
-                "subject": "Reset your HouseHaunt password",
-                "html": f"""
-                    <p>Hello {user.get("username")},</p>
-
-                    <p>Click the link below to reset your password:</p>
-
-                    <p><a href="{reset_link}">Reset Password</a></p>
-
-                    <p>This link expires in 30 minutes.</p>
-
-                    <p>If you did not request this, ignore this email.</p>
-                """
-            },
-            timeout=10
-        )
+        send_resend_email(
+            [email],
+            "Reset your HouseHaunt password",
+            f"""
+                <p>Hello {user.get("username")},</p>
 
-        if response.status_code >= 400:
-            print("Resend API error:", response.text)
-            return jsonify({
-                "error": "Failed to send reset email"
-            }), 500
+                <p>Click the link below to reset your password:</p>
+
+                <p><a href="{reset_link}">Reset Password</a></p>
+
+                <p>This link expires in 30 minutes.</p>
+
+                <p>If you did not request this, ignore this email.</p>
+            """,
+            idempotency_key=(
+                f"password-reset:{user['_id']}:"
+                f"{int(time.time()) // RESET_EMAIL_WINDOW}"
+            ),
+        )
 
         return jsonify({
             "message": "If the email exists, a reset link has been sent."
@@ -238,6 +232,7 @@ def reset_password(token):
                 "password_updated_at": datetime.utcnow()
             }}
         )
+        invalidate_user(record["user_id"])
 
         mongo.db.password_resets.update_one(
             {"_id": record["_id"]},
@@ -2,9 +2,13 @@ from flask import Blueprint, jsonify, request, g
 from datetime import datetime
 from bson import ObjectId
 import bson.errors
+from pymongo import ASCENDING, DESCENDING
 
 from app.extensions import mongo
 from app.utils.auth_helpers import jwt_required
+from app.utils.query_stats import query_budget
+from app.utils.chats import other_participant, record_message
+from app.utils.pagination import parse_limit, keyset_filter
 
 bp = Blueprint("chat", __name__, url_prefix="/api/chat")
 
@@ -44,6 +48,7 @@ def serialize_message(m):
 # ===============================
 
 @bp.route("", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_user_chats():
     user = g.user
@@ -55,34 +60,36 @@ def get_user_chats():
         else {"haunter_id": user["_id"]}
     )
 
-    chats = mongo.db.chats.find(query).sort("created_at", -1)
+    # Most recently active first, served by (<role>_id, last_message_at, _id)
+    chats = list(mongo.db.chats.find(query).sort([("last_message_at", -1), ("_id", -1)]))
 
-    results = []
-
-    for chat in chats:
-        chat_id = chat["_id"]
-
-        other_user_id = (
-            chat["haunter_id"] if role == "agent"
-            else chat["agent_id"]
-        )
-
-        other_user = mongo.db.users.find_one(
-            {"_id": other_user_id},
+    other_ids = [other_participant(chat, user["_id"]) for chat in chats]
+    others = {
+        u["_id"]: u
+        for u in mongo.db.users.find(
+            {"_id": {"$in": other_ids}},
             {"username": 1, "email": 1, "role": 1}
         )
+    }
 
-        # ✅ UNREAD COUNT
-        unread_count = mongo.db.messages.count_documents({
-            "chat_id": chat_id,
-            "sender_id": {"$ne": user["_id"]},
-            "read_at": None
-        })
+    results = []
+
+    for chat, other_user_id in zip(chats, other_ids):
+        other_user = others.get(other_user_id)
+
+        # ✅ UNREAD COUNT (maintained on the chat by send/read paths)
+        unread_count = chat.get("unread_counts", {}).get(str(user["_id"]), 0)
+        last_message = chat.get("last_message")
 
         results.append({
-            "chat_id": str(chat_id),
+            "chat_id": str(chat["_id"]),
             "created_at": chat["created_at"].isoformat() if chat.get("created_at") else None,
             "unread_count": unread_count,
+            "last_message": {
+                "sender_id": str(last_message["sender_id"]),
+                "content": last_message.get("content"),
+                "created_at": last_message["created_at"].isoformat() if last_message.get("created_at") else None,
+            } if last_message else None,
             "participant": {
                 "id": str(other_user["_id"]) if other_user else None,
                 "username": other_user.get("username") if other_user else None,
@@ -102,6 +109,7 @@ def get_user_chats():
 # ===============================
 
 @bp.route("/<chat_id>/messages", methods=["GET", "POST"])
+@query_budget(5)
 @jwt_required()
 def chat_messages(chat_id):
     chat_oid = parse_object_id(chat_id)
@@ -138,6 +146,7 @@ def chat_messages(chat_id):
         }
 
         result = mongo.db.messages.insert_one(message)
+        record_message(chat, g.user["_id"], content, now)
 
         return jsonify({
             "message": "Message sent",
@@ -149,10 +158,45 @@ def chat_messages(chat_id):
     # GET MESSAGES
     # ===============================
 
-    messages = mongo.db.messages.find(
-        {"chat_id": chat_oid}
-    ).sort("created_at", 1)
+    # ?before=<id> pages backwards through history; ?after=<id> returns what
+    # a reconnecting client missed. Both walk the (chat_id, created_at, _id)
+    # index from the anchor message.
+    before = request.args.get("before")
+    after = request.args.get("after")
+    limit = parse_limit(request.args.get("limit"), default=50, maximum=200)
+
+    if before and after:
+        return jsonify({"error": "Use either before or after, not both"}), 400
+
+    query = {"chat_id": chat_oid}
+
+    if before or after:
+        anchor = mongo.db.messages.find_one(
+            {"_id": parse_object_id(before or after), "chat_id": chat_oid},
+            {"created_at": 1}
+        )
+        if not anchor:
+            return jsonify({"error": "Anchor message not found"}), 404
+
+        direction = ASCENDING if after else DESCENDING
+        query.update(keyset_filter("created_at", direction, anchor["created_at"], anchor["_id"]))
+    else:
+        direction = DESCENDING
+
+    messages = list(
+        mongo.db.messages.find(query)
+        .sort([("created_at", direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+
+    # Always hand messages back oldest-first
+    if direction == DESCENDING:
+        messages.reverse()
 
     return jsonify({
-        "messages": [serialize_message(m) for m in messages]
-    }), 200
\ No newline at end of file
+        "messages": [serialize_message(m) for m in messages],
+        "has_more": has_more,
+    }), 200
@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify, g
-from bson import ObjectId
 from app.extensions import mongo
 from app.utils.auth_helpers import jwt_required, role_required, admin_required
+from app.utils.haunter_dashboard import get_dashboard
+from app.utils.query_stats import query_budget
+from app.utils.cache import agent_dashboard_cache
 
 bp = Blueprint("dashboard", __name__, url_prefix="/api/dashboard")
 
@@ -16,34 +18,111 @@ def ping():
 # -------------------------
 
 
-def convert_objectid(obj):
-    """Recursively convert all ObjectIds in dict/list to strings."""
-    if isinstance(obj, list):
-        return [convert_objectid(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_objectid(v) for k, v in obj.items()}
-    elif isinstance(obj, ObjectId):
-        return str(obj)
-    else:
-        return obj
+RECENT_LIMIT = 5
+
+
+def recent(kind, fields):
+    return [
+        {"$match": {"_kind": kind}},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": RECENT_LIMIT},
+        {"$project": {f: 1 for f in fields}},
+    ]
+
+
+def counts_by_status(kind):
+    return [
+        {"$match": {"_kind": kind}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+
+
+def tagged(collection, match, fields, kind):
+    """$unionWith stage pulling one collection's rows for this agent, tagged by kind."""
+    return {"$unionWith": {"coll": collection, "pipeline": [
+        {"$match": match},
+        {"$project": {"_kind": {"$literal": kind}, **{f: 1 for f in fields}}},
+    ]}}
+
+
+def build_agent_summary(agent_id):
+    """
+    Counts, recent items, KYC and wallet for one agent in a single aggregation:
+    each source collection is matched on its agent index, tagged and unioned,
+    then $facet splits the stream into the summary sections.
+    """
+    house_fields = ["title", "location", "price", "status", "favorite_count", "created_at"]
+    request_fields = ["status", "haunter_id", "house_id", "created_at"]
+    review_fields = ["rating", "comment", "reviewer_id", "created_at"]
+
+    summary = mongo.db.houses.aggregate([
+        {"$match": {"agent_id": agent_id}},
+        {"$project": {"_kind": {"$literal": "house"}, **{f: 1 for f in house_fields}}},
+        tagged("contact_requests", {"agent_id": agent_id}, request_fields, "request"),
+        tagged("reviews", {"agent_id": agent_id}, review_fields, "review"),
+        tagged("kyc", {"agent_id": agent_id}, ["status", "uploaded_at", "reviewed_at"], "kyc"),
+        tagged("wallets", {"user_id": agent_id}, ["balance", "credits_spent"], "wallet"),
+        {"$facet": {
+            "house_counts": counts_by_status("house"),
+            "recent_houses": recent("house", house_fields),
+            "request_counts": counts_by_status("request"),
+            "recent_requests": recent("request", request_fields),
+            "recent_reviews": recent("review", review_fields),
+            "kyc": [{"$match": {"_kind": "kyc"}}, {"$limit": 1}],
+            "wallet": [{"$match": {"_kind": "wallet"}}, {"$limit": 1}],
+        }},
+    ]).next()
+
+    def status_counts(rows):
+        counts = {row["_id"] or "unknown": row["count"] for row in rows}
+        return {"total": sum(counts.values()), "by_status": counts}
+
+    kyc = summary["kyc"][0] if summary["kyc"] else None
+    wallet = summary["wallet"][0] if summary["wallet"] else None
+
+    return {
+        "wallet": {
+            "balance": wallet.get("balance", 0) if wallet else 0,
+            "credits_spent": wallet.get("credits_spent", 0) if wallet else 0
+        },
+        "kyc": {
+            "status": kyc.get("status", "not_submitted") if kyc else "not_submitted",
+            "uploaded_at": kyc.get("uploaded_at") if kyc else None,
+            "reviewed_at": kyc.get("reviewed_at") if kyc else None
+        },
+        "houses": {
+            **status_counts(summary["house_counts"]),
+            "recent": summary["recent_houses"],
+        },
+        "contact_requests": {
+            **status_counts(summary["request_counts"]),
+            "recent": summary["recent_requests"],
+        },
+        "recent_reviews": summary["recent_reviews"],
+    }
+
 
 @bp.route("/agent", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 @role_required("agent")
 def agent_dashboard():
+    """
+    Bounded summary; full lists live at /api/agent/my-houses and
+    /api/agent/contact-requests (both paginated).
+    """
     user_id = g.user["_id"]
 
-    # Fetch data from MongoDB
-    kyc = mongo.db.kyc.find_one({"agent_id": user_id})
-    wallet = mongo.db.wallets.find_one({"user_id": user_id})
-    houses = list(mongo.db.houses.find({"agent_id": user_id}))
-    reviews = list(mongo.db.reviews.find({"agent_id": user_id}))
-    contact_requests = list(mongo.db.contact_requests.find({"agent_id": user_id}))
+    summary = agent_dashboard_cache.get(str(user_id))
+    if summary is None:
+        summary = build_agent_summary(user_id)
+        agent_dashboard_cache.set(str(user_id), summary)
 
-    # Compute average rating safely
-    avg_rating = round(sum(r.get("rating", 0) for r in reviews) / len(reviews), 2) if reviews else 0
+    # Rating aggregates are maintained on the agent by review.create_review
+    review_count = g.user.get("rating_count", 0)
+    histogram = g.user.get("rating_histogram") or {}
+    avg_rating = round(g.user.get("rating_sum", 0) / review_count, 2) if review_count else 0
 
-    # Prepare data for JSON response
     response = {
         "agent": {
             "id": str(user_id),
@@ -51,25 +130,21 @@ def agent_dashboard():
             "email": g.user.get("email", ""),
             "joined_on": g.user.get("created_at")
         },
-        "wallet": {
-            "balance": wallet.get("balance", 0) if wallet else 0,
-            "credits_spent": wallet.get("credits_spent", 0) if wallet else 0
-        },
-        "kyc": {
-            "status": kyc.get("status", "not_submitted") if kyc else "not_submitted",
-            "uploaded_at": kyc.get("uploaded_at") if kyc else None,
-            "reviewed_at": kyc.get("reviewed_at") if kyc else None
+        "wallet": summary["wallet"],
+        "kyc": summary["kyc"],
+        "houses": summary["houses"],
+        "contact_requests": summary["contact_requests"],
+        "reviews": {
+            "total": review_count,
+            "average_rating": avg_rating,
+            "histogram": {str(star): histogram.get(str(star), 0) for star in range(1, 6)},
+            "recent": summary["recent_reviews"],
         },
-        "houses": houses,
-        "reviews": reviews,
         "average_rating": avg_rating,
-        "contact_requests": contact_requests
     }
 
-    # Convert all ObjectIds to strings recursively
-    response_safe = convert_objectid(response)
-
-    return jsonify(response_safe), 200
+    # ObjectIds/datetimes are serialised by the app's JSON provider
+    return jsonify(response), 200
 
 
 
@@ -77,26 +152,15 @@ def agent_dashboard():
 # Haunter Dashboard
 # -------------------------
 @bp.route("/haunter", methods=["GET"])
+@query_budget(8)  # 2 once the read model exists; 8 when it is built lazily
 @jwt_required()
 @role_required("haunter")
 def haunter_dashboard():
     user_id = g.user["_id"]
 
-    wallet = mongo.db.wallets.find_one({"user_id": user_id})
-    requests = list(mongo.db.contact_requests.find({"haunter_id": user_id}))
-    reviews = list(mongo.db.reviews.find({"haunter_id": user_id}))
-
-    requested_houses = []
-    for r in requests:
-        house = mongo.db.houses.find_one({"_id": r.get("house_id")})
-        if house:
-            requested_houses.append({
-                "id": str(house["_id"]),
-                "title": house["title"],
-                "location": house["location"],
-                "price": house["price"],
-                "agent_id": str(house["agent_id"])
-            })
+    # Maintained read model; see app/utils/haunter_dashboard.py
+    dashboard = get_dashboard(user_id)
+    wallet = dashboard.get("wallet", {})
 
     return jsonify({
         "haunter": {
@@ -106,16 +170,22 @@ def haunter_dashboard():
             "joined_on": g.user.get("created_at")
         },
         "wallet": {
-            "balance": wallet.get("balance", 0) if wallet else 0,
-            "last_updated": wallet.get("updated_at") if wallet else None
+            "balance": wallet.get("balance", 0),
+            "last_updated": wallet.get("updated_at")
         },
-        "requested_houses": requested_houses,
+        "requested_houses": [{
+            "id": str(r["house_id"]),
+            "title": r.get("title"),
+            "location": r.get("location"),
+            "price": r.get("price"),
+            "agent_id": str(r.get("agent_id")),
+            "requested_at": r.get("created_at"),
+        } for r in dashboard.get("recent_requests", [])],
         "reviews_written": [{
             "agent_id": str(r["agent_id"]),
             "rating": r["rating"],
             "comment": r.get("comment", "")
-        } for r in reviews],
-        "total_requests": len(requested_houses),
-        "total_reviews": len(reviews)
+        } for r in dashboard.get("recent_reviews", [])],
+        "total_requests": dashboard.get("total_requests", 0),
+        "total_reviews": dashboard.get("total_reviews", 0)
     }), 200
-
@@ -1,7 +1,12 @@
-from flask import Blueprint, jsonify, g
+from flask import Blueprint, jsonify, g, request
+from datetime import datetime
 from app.utils.auth_helpers import jwt_required, role_required
+from app.utils.query_stats import query_budget
+from app.utils.cache import listing_cache
+from app.utils.favorites import favorite_house_ids, cache_favorite_added, cache_favorite_removed
 from app.extensions import mongo
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 bp = Blueprint("favorites", __name__, url_prefix="/api/favorites")
 
@@ -11,20 +16,40 @@ def ping():
     return jsonify({"message": "favorites blueprint active!"}), 200
 
 
+# Fields a favorite card needs; skips descriptions and search fields
+CARD_PROJECTION = {
+    "title": 1,
+    "location": 1,
+    "price": 1,
+    "image_url": 1,
+    "images": 1,
+    "favorite_count": 1,
+}
+
+
 # ======================================================
 # GET FAVORITES
 # ======================================================
 @bp.route("/", methods=["GET"])
+@query_budget(3)
 @jwt_required()
 @role_required("haunter")
 def get_favorites():
     haunter_id = g.user["_id"]
     favorites = list(mongo.db.favorites.find({"haunter_id": haunter_id}))
 
+    houses = {
+        h["_id"]: h
+        for h in mongo.db.houses.find(
+            {"_id": {"$in": [fav["house_id"] for fav in favorites]}},
+            CARD_PROJECTION,
+        )
+    }
+
     results = []
 
     for fav in favorites:
-        house = mongo.db.houses.find_one({"_id": fav["house_id"]})
+        house = houses.get(fav["house_id"])
 
         if house:
             results.append({
@@ -34,7 +59,8 @@ def get_favorites():
                 "location": house["location"],
                 "price": house["price"],
                 "image_url": house.get("image_url"),
-                "images": house.get("images", [])
+                "images": house.get("images", []),
+                "favorite_count": house.get("favorite_count", 0),
             })
 
     return jsonify({
@@ -51,18 +77,31 @@ def get_favorites():
 @role_required("haunter")
 def add_favorite(house_id):
     haunter_id = g.user["_id"]
-    house_oid = ObjectId(house_id)
 
-    if mongo.db.favorites.find_one({
-        "haunter_id": haunter_id,
-        "house_id": house_oid
-    }):
+    try:
+        house_oid = ObjectId(house_id)
+    except:
+        return jsonify({"error": "Invalid house id"}), 400
+
+    # The unique (haunter_id, house_id) index makes this a single
+    # check-and-insert; a concurrent duplicate lands on the except branch.
+    try:
+        result = mongo.db.favorites.update_one(
+            {"haunter_id": haunter_id, "house_id": house_oid},
+            {"$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        result = None
+
+    cache_favorite_added(haunter_id, house_oid)
+
+    if result is None or result.upserted_id is None:
         return jsonify({"message": "House already in favorites."}), 200
 
-    mongo.db.favorites.insert_one({
-        "haunter_id": haunter_id,
-        "house_id": house_oid
-    })
+    mongo.db.houses.update_one({"_id": house_oid}, {"$inc": {"favorite_count": 1}})
+    # favorite_count is on the cached cards and drives sort=popular
+    listing_cache.invalidate_tag("houses")
 
     return jsonify({"message": "House added to favorites!"}), 201
 
@@ -76,12 +115,55 @@ def add_favorite(house_id):
 def remove_favorite(favorite_id):
     haunter_id = g.user["_id"]
 
-    result = mongo.db.favorites.delete_one({
-        "_id": ObjectId(favorite_id),
-        "haunter_id": haunter_id
-    })
+    try:
+        favorite_oid = ObjectId(favorite_id)
+    except:
+        return jsonify({"error": "Invalid favorite id"}), 400
 
-    if result.deleted_count == 0:
+    favorite = mongo.db.favorites.find_one_and_delete(
+        {"_id": favorite_oid, "haunter_id": haunter_id},
+        projection={"house_id": 1},
+    )
+
+    if favorite is None:
         return jsonify({"error": "Favorite not found."}), 404
 
+    mongo.db.houses.update_one(
+        {"_id": favorite["house_id"], "favorite_count": {"$gt": 0}},
+        {"$inc": {"favorite_count": -1}},
+    )
+    listing_cache.invalidate_tag("houses")
+    cache_favorite_removed(haunter_id, favorite["house_id"])
+
     return jsonify({"message": "House removed from favorites."}), 200
+
+
+# ======================================================
+# CHECK FAVORITES (BULK)
+# ======================================================
+MAX_CHECK_IDS = 500
+
+
+@bp.route("/check", methods=["POST"])
+@query_budget(2)
+@jwt_required()
+@role_required("haunter")
+def check_favorites():
+    data = request.get_json(silent=True) or {}
+    house_ids = data.get("house_ids")
+
+    if not isinstance(house_ids, list) or len(house_ids) > MAX_CHECK_IDS:
+        return jsonify({"error": f"house_ids must be a list of at most {MAX_CHECK_IDS} ids"}), 400
+
+    try:
+        oids = [ObjectId(house_id) for house_id in house_ids]
+    except:
+        return jsonify({"error": "Invalid house id"}), 400
+
+    favorited = favorite_house_ids(g.user["_id"])
+
+    return jsonify({
+        "favorites": {
+            house_id: oid in favorited for house_id, oid in zip(house_ids, oids)
+        }
+    }), 200
@@ -1,9 +1,18 @@
-from flask import Blueprint, jsonify, g, request
+from flask import Blueprint, jsonify, g, request, current_app
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 from app.extensions import mongo
 from app.utils.auth_helpers import jwt_required, role_required
-from app.utils.notify import create_notification
+from app.utils.query_stats import query_budget
+from app.utils.cache import listing_cache
+from app.utils.ledger import spend_credits, InsufficientCredits
+from app.utils.notify import build_notification, publish_notification
+from app.utils.lookups import usernames_by_id
+from app.utils.favorites import favorite_house_ids
+from app.utils.haunter_dashboard import record_contact_request, request_entry
+from app.utils.pagination import parse_limit, encode_cursor, decode_cursor, keyset_filter
+from app.utils.search import query_terms, SEARCH_PROJECTION
 
 bp = Blueprint("haunter", __name__, url_prefix="/api/haunter")
 
@@ -16,37 +25,77 @@ def ping():
 # ============================================================
 # Get All Approved Houses (SEARCH + FILTER)
 # ============================================================
-@bp.route("/houses", methods=["GET"])
-@jwt_required()
-@role_required("haunter")
-def get_all_houses():
-    search = request.args.get("search")
-    min_price = request.args.get("min_price", type=float)
-    max_price = request.args.get("max_price", type=float)
-
-    query = {"status": "approved"}
-
-    if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"location": {"$regex": search, "$options": "i"}},
-        ]
-
-    if min_price is not None or max_price is not None:
-        query["price"] = {}
-        if min_price is not None:
-            query["price"]["$gte"] = min_price
-        if max_price is not None:
-            query["price"]["$lte"] = max_price
+# sort option -> (field, direction); each is served by a
+# (status, field, _id) compound index so every page is an index range scan.
+HOUSE_SORTS = {
+    "newest": ("created_at", DESCENDING),
+    "price_asc": ("price", ASCENDING),
+    "price_desc": ("price", DESCENDING),
+    "popular": ("favorite_count", DESCENDING),
+}
+
+
+def find_houses_by_relevance(query, terms, position, limit):
+    """Rank search matches by how many query terms hit the title."""
+    pipeline = [
+        {"$match": query},
+        {"$addFields": {
+            "_score": {"$size": {"$setIntersection": [
+                terms, {"$ifNull": ["$search_title", []]}
+            ]}}
+        }},
+    ]
+
+    if position:
+        pipeline.append({"$match": keyset_filter(
+            "_score", DESCENDING, position["value"], position["id"]
+        )})
+
+    pipeline += [
+        {"$sort": {"_score": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": SEARCH_PROJECTION},
+    ]
+
+    return list(mongo.db.houses.aggregate(pipeline))
+
+
+def build_house_listing(query, terms, sort, position, limit):
+    """Fetch one page of approved houses and shape it into the API payload."""
+    if sort == "relevance":
+        sort_field = "_score"
+        houses = find_houses_by_relevance(query, terms, position, limit)
+    else:
+        sort_field, direction = HOUSE_SORTS[sort]
+
+        if position:
+            query = {**query, "$and": [
+                keyset_filter(sort_field, direction, position["value"], position["id"])
+            ]}
+
+        # Fetch one extra row to know whether another page exists
+        houses = list(
+            mongo.db.houses.find(query, SEARCH_PROJECTION)
+            .sort([(sort_field, direction), ("_id", direction)])
+            .limit(limit + 1)
+        )
+
+    next_cursor = None
+    if len(houses) > limit:
+        houses = houses[:limit]
+        last = houses[-1]
+        next_cursor = encode_cursor({
+            "kind": "houses",
+            "sort": sort,
+            "value": last.get(sort_field),
+            "id": last["_id"],
+        })
 
-    houses = list(
-        mongo.db.houses.find(query).sort("created_at", -1)
-    )
+    agent_names = usernames_by_id(h.get("agent_id") for h in houses)
 
     results = []
 
     for house in houses:
-        agent = mongo.db.users.find_one({"_id": house.get("agent_id")})
         images = house.get("images", [])
 
         results.append({
@@ -62,17 +111,91 @@ def get_all_houses():
             # ✅ OPTIONAL convenience field for card views
             "preview_image": images[0] if images else None,
 
-            "agent_name": agent["username"] if agent else "Unknown",
+            "agent_name": agent_names.get(house.get("agent_id"), "Unknown"),
+            "favorite_count": house.get("favorite_count", 0),
             "created_at": house.get("created_at"),
         })
 
-    return jsonify({"houses": results}), 200
+    return {
+        "houses": results,
+        "next_cursor": next_cursor,
+        "limit": limit,
+    }
+
+
+@bp.route("/houses", methods=["GET"])
+@query_budget(4)
+@jwt_required()
+@role_required("haunter")
+def get_all_houses():
+    search = request.args.get("search")
+    min_price = request.args.get("min_price", type=float)
+    max_price = request.args.get("max_price", type=float)
+    limit = parse_limit(request.args.get("limit"))
+
+    terms = query_terms(search)
+    sort = request.args.get("sort") or ("relevance" if terms else "newest")
+
+    if sort == "relevance" and not terms:
+        sort = "newest"
+
+    if sort != "relevance" and sort not in HOUSE_SORTS:
+        options = ", ".join(["relevance", *HOUSE_SORTS])
+        return jsonify({"error": f"sort must be one of {options}"}), 400
+
+    query = {"status": "approved"}
+
+    if terms:
+        # Every term must prefix-match a word in title/location/description
+        query["search_prefixes"] = {"$all": terms}
+
+    if min_price is not None or max_price is not None:
+        query["price"] = {}
+        if min_price is not None:
+            query["price"]["$gte"] = min_price
+        if max_price is not None:
+            query["price"]["$lte"] = max_price
+
+    position = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor, kind="houses", sort=sort)
+        if position is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    # Payloads are user-agnostic, so one cached page serves every haunter;
+    # is_favorite is added per request from the user's cached favorite set
+    cache_key = (tuple(terms), sort, min_price, max_price, cursor, limit)
+    app = current_app._get_current_object()
+
+    def compute():
+        return build_house_listing(query, terms, sort, position, limit)
+
+    def refresh():
+        # Stale-while-revalidate runs in a bare thread; only it needs its own
+        # context, so misses stay in the request's g (query stats, budgets)
+        with app.app_context():
+            return compute()
+
+    payload = listing_cache.get_or_compute(
+        cache_key, compute, tags=("houses",), refresh=refresh
+    )
+
+    # Cached cards are shared across users, so annotate copies
+    favorited = favorite_house_ids(g.user["_id"])
+    houses = [
+        {**house, "is_favorite": ObjectId(house["id"]) in favorited}
+        for house in payload["houses"]
+    ]
+
+    return jsonify({**payload, "houses": houses}), 200
 
 
 # ============================================================
 # House Details
 # ============================================================
 @bp.route("/house/<house_id>", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 @role_required("haunter")
 def get_house_details(house_id):
@@ -84,22 +207,22 @@ def get_house_details(house_id):
     house = mongo.db.houses.find_one({
         "_id": house_obj,
         "status": "approved",
-    })
+    }, SEARCH_PROJECTION)
 
     if not house:
         return jsonify({"error": "House not found or not approved."}), 404
 
-    agent = mongo.db.users.find_one({"_id": house.get("agent_id")})
-
-    # 🔥 NEW: Fetch agent reviews
-    reviews = list(mongo.db.reviews.find({
-        "agent_id": house.get("agent_id")
-    }))
+    agent = mongo.db.users.find_one(
+        {"_id": house.get("agent_id")},
+        {"username": 1, "email": 1, "rating_sum": 1, "rating_count": 1, "rating_histogram": 1}
+    )
 
-    review_count = len(reviews)
+    # Rating aggregates are maintained on the agent by review.create_review
+    review_count = agent.get("rating_count", 0) if agent else 0
+    histogram = (agent.get("rating_histogram") or {}) if agent else {}
 
     if review_count > 0:
-        avg_rating = sum(r["rating"] for r in reviews) / review_count
+        avg_rating = agent.get("rating_sum", 0) / review_count
     else:
         avg_rating = 0
 
@@ -122,7 +245,10 @@ def get_house_details(house_id):
 
             # 🔥 NEW FIELDS
             "rating": round(avg_rating, 1),
-            "review_count": review_count
+            "review_count": review_count,
+            "rating_histogram": {
+                str(star): histogram.get(str(star), 0) for star in range(1, 6)
+            },
         },
 
         "created_at": house.get("created_at"),
@@ -132,57 +258,83 @@ def get_house_details(house_id):
 # ============================================================
 # Contact Agent
 # ============================================================
+CONTACT_COST = 2
+
+
 @bp.route("/contact-agent/<house_id>", methods=["POST"])
 @jwt_required()
 @role_required("haunter")
 def contact_agent(house_id):
     user_id = g.user["_id"]
 
-    house = mongo.db.houses.find_one({
-        "_id": ObjectId(house_id),
-        "status": "approved",
-    })
+    try:
+        house_obj = ObjectId(house_id)
+    except Exception:
+        return jsonify({"error": "Invalid house id"}), 400
+
+    house = mongo.db.houses.find_one(
+        {"_id": house_obj, "status": "approved"},
+        {"title": 1, "location": 1, "price": 1, "agent_id": 1}
+    )
     if not house:
         return jsonify({"error": "House not found or not approved."}), 404
 
-    wallet = mongo.db.wallets.find_one({"user_id": user_id})
-    if not wallet or wallet.get("balance", 0) < 2:
+    notifications = [
+        build_notification(
+            house["agent_id"],
+            f"A haunter requested contact for '{house['title']}'."
+        ),
+        build_notification(
+            user_id,
+            f"{CONTACT_COST} credits deducted for contacting '{house['title']}'."
+        ),
+    ]
+
+    def record_contact(session):
+        wallet = spend_credits(
+            user_id,
+            CONTACT_COST,
+            f"Requested contact info for '{house['title']}'",
+            session=session,
+        )
+
+        created_at = datetime.utcnow()
+        request_id = mongo.db.contact_requests.insert_one({
+            "haunter_id": user_id,
+            "agent_id": house["agent_id"],
+            "house_id": house["_id"],
+            "status": "pending",
+            "created_at": created_at,
+        }, session=session).inserted_id
+
+        mongo.db.notifications.insert_many(notifications, session=session)
+        mongo.db.counters.bulk_write([
+            *(
+                UpdateOne({"_id": n["user_id"]}, {"$inc": {"notifications_unread": 1}}, upsert=True)
+                for n in notifications
+            ),
+            # Agent inbox badge; decide_contact_request decrements it
+            UpdateOne({"_id": house["agent_id"]}, {"$inc": {"contact_requests_pending": 1}}, upsert=True),
+        ], session=session)
+
+        record_contact_request(
+            user_id, request_entry(request_id, house, created_at), wallet, session=session
+        )
+
+        return wallet
+
+    # Deduction, ledger entry, request, notifications and the haunter's
+    # dashboard commit or fail together
+    try:
+        with mongo.cx.start_session() as session:
+            wallet = session.with_transaction(record_contact)
+    except InsufficientCredits:
         return jsonify({"error": "Insufficient credits"}), 402
 
-    new_balance = wallet["balance"] - 2
-
-    mongo.db.wallets.update_one(
-        {"_id": wallet["_id"]},
-        {"$set": {"balance": new_balance}},
-    )
-
-    mongo.db.transactions.insert_one({
-        "user_id": user_id,
-        "amount": -2,
-        "txn_type": "deduction",
-        "description": f"Requested contact info for '{house['title']}'",
-        "created_at": datetime.utcnow(),
-    })
-
-    mongo.db.contact_requests.insert_one({
-    "haunter_id": user_id,
-    "agent_id": house["agent_id"],
-    "house_id": house["_id"],
-    "status": "pending",
-    "created_at": datetime.utcnow(),
-})
-
-
-    create_notification(
-        house["agent_id"],
-        f"A haunter requested contact for '{house['title']}'."
-    )
-    create_notification(
-        user_id,
-        f"2 credits deducted for contacting '{house['title']}'."
-    )
+    for notif in notifications:
+        publish_notification(notif)
 
     return jsonify({
         "message": f"Contact request sent for '{house['title']}'.",
-        "remaining_balance": new_balance,
-    }), 201
\ No newline at end of file
+        "remaining_balance": wallet["balance"],
+    }), 201
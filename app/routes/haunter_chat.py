@@ -3,6 +3,7 @@ from bson import ObjectId
 from datetime import datetime
 from app import mongo
 from app.utils.auth_helpers import jwt_required, role_required
+from app.utils.chats import record_message
 
 bp = Blueprint("haunter_chat", __name__, url_prefix="/api/haunter/chat")
 
@@ -12,7 +13,7 @@ bp = Blueprint("haunter_chat", __name__, url_prefix="/api/haunter/chat")
 def get_haunter_chats():
     chats = list(
         mongo.db.chats.find({"haunter_id": g.user["_id"]})
-        .sort("created_at", -1)
+        .sort([("last_message_at", -1), ("_id", -1)])
     )
 
     return jsonify({
@@ -43,12 +44,15 @@ def send_message(chat_id):
     if not chat:
         return jsonify({"error": "Chat not found"}), 404
 
+    now = datetime.utcnow()
+
     mongo.db.messages.insert_one({
         "chat_id": ObjectId(chat_id),
         "sender_id": g.user["_id"],
         "sender_role": "haunter",
         "content": content,
-        "created_at": datetime.utcnow(),
+        "created_at": now,
     })
+    record_message(chat, g.user["_id"], content, now)
 
     return jsonify({"message": "Sent"}), 201
@@ -7,6 +7,8 @@ import cloudinary.uploader
 
 from app.utils.auth_helpers import jwt_required, role_required
 from app.extensions import mongo
+from app.utils.cache import agent_dashboard_cache
+from app.utils.metrics import track_outbound
 
 bp = Blueprint("kyc", __name__, url_prefix="/api/kyc")
 
@@ -59,12 +61,13 @@ def upload_kyc():
             continue
 
         try:
-            result = cloudinary.uploader.upload(
-                file,
-                folder="kyc_docs",
-                public_id=f"{agent_id}_{int(datetime.utcnow().timestamp())}",
-                resource_type="auto"
-            )
+            with track_outbound("cloudinary"):
+                result = cloudinary.uploader.upload(
+                    file,
+                    folder="kyc_docs",
+                    public_id=f"{agent_id}_{int(datetime.utcnow().timestamp())}",
+                    resource_type="auto"
+                )
 
             uploaded_files.append({
                 "url": result["secure_url"],
@@ -88,6 +91,7 @@ def upload_kyc():
         }},
         upsert=True
     )
+    agent_dashboard_cache.delete(str(agent_id))
 
     return jsonify({"message": "KYC submitted successfully"}), 201
 
@@ -0,0 +1,14 @@
+# app/routes/metrics.py
+from flask import Blueprint, Response
+from app.utils.auth_helpers import jwt_required, role_required
+from app.utils.metrics import registry
+
+bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
+
+
+# Prometheus text exposition for this worker process
+@bp.route("", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def get_metrics():
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
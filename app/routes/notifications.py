@@ -1,9 +1,12 @@
 # app/routes/notifications.py
-from flask import Blueprint, jsonify, g
+from flask import Blueprint, jsonify, g, request
 from datetime import datetime
 from bson import ObjectId
+from pymongo import DESCENDING
 from app.extensions import mongo
 from app.utils.auth_helpers import jwt_required
+from app.utils.notify import serialize_notification, change_unread_count, get_unread_count
+from app.utils.pagination import parse_limit, encode_cursor, decode_cursor, keyset_filter
 
 bp = Blueprint("notifications", __name__, url_prefix="/api/notifications")
 
@@ -13,21 +16,54 @@ def ping():
     return jsonify({"message": "Notifications blueprint active!"}), 200
 
 
-# Fetch all notifications
+# Fetch notifications, newest first, one page at a time
 @bp.route("/", methods=["GET"])
 @jwt_required()
 def get_notifications():
-    user_id = g.user["_id"]
-    notifications = list(mongo.db.notifications.find({"user_id": user_id}).sort("created_at", -1))
+    limit = parse_limit(request.args.get("limit"))
+    query = {"user_id": g.user["_id"]}
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor, kind="notifications")
+        if position is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        query["$and"] = [
+            keyset_filter("created_at", DESCENDING, position["value"], position["id"])
+        ]
+
+    # Served by the (user_id, created_at, _id) index
+    notifications = list(
+        mongo.db.notifications.find(query)
+        .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        last = notifications[-1]
+        next_cursor = encode_cursor({
+            "kind": "notifications",
+            "value": last.get("created_at"),
+            "id": last["_id"],
+        })
+
+    results = [serialize_notification(n) for n in notifications]
 
-    results = [{
-        "id": str(n["_id"]),
-        "message": n.get("message"),
-        "is_read": n.get("is_read", False),
-        "created_at": n.get("created_at")
-    } for n in notifications]
+    return jsonify({
+        "total": len(results),
+        "notifications": results,
+        "next_cursor": next_cursor,
+        "limit": limit,
+    }), 200
 
-    return jsonify({"total": len(results), "notifications": results}), 200
+
+# Unread badge, served from the maintained counter
+@bp.route("/unread-count", methods=["GET"])
+@jwt_required()
+def unread_count():
+    return jsonify({"unread_count": get_unread_count(g.user["_id"])}), 200
 
 
 # Mark single as read
@@ -35,12 +71,15 @@ def get_notifications():
 @jwt_required()
 def mark_as_read(notification_id):
     user_id = g.user["_id"]
-    result = mongo.db.notifications.update_one(
+    before = mongo.db.notifications.find_one_and_update(
         {"_id": ObjectId(notification_id), "user_id": user_id},
-        {"$set": {"is_read": True}}
+        {"$set": {"is_read": True}},
+        projection={"is_read": 1}
     )
-    if result.matched_count == 0:
+    if before is None:
         return jsonify({"error": "Notification not found"}), 404
+    if not before.get("is_read"):
+        change_unread_count(user_id, -1)
     return jsonify({"message": "Notification marked as read."}), 200
 
 
@@ -53,6 +92,8 @@ def mark_all_read():
         {"user_id": user_id, "is_read": False},
         {"$set": {"is_read": True}}
     )
+    if result.modified_count:
+        change_unread_count(user_id, -result.modified_count)
     return jsonify({"message": f"{result.modified_count} notifications marked as read."}), 200
 
 
@@ -61,9 +102,14 @@ def mark_all_read():
 @jwt_required()
 def delete_notification(notification_id):
     user_id = g.user["_id"]
-    result = mongo.db.notifications.delete_one({"_id": ObjectId(notification_id), "user_id": user_id})
-    if result.deleted_count == 0:
+    deleted = mongo.db.notifications.find_one_and_delete(
+        {"_id": ObjectId(notification_id), "user_id": user_id},
+        projection={"is_read": 1}
+    )
+    if deleted is None:
         return jsonify({"error": "Notification not found"}), 404
+    if not deleted.get("is_read"):
+        change_unread_count(user_id, -1)
     return jsonify({"message": "Notification deleted successfully."}), 200
 
 
@@ -73,4 +119,9 @@ def delete_notification(notification_id):
 def clear_notifications():
     user_id = g.user["_id"]
     mongo.db.notifications.delete_many({"user_id": user_id})
+    mongo.db.counters.update_one(
+        {"_id": user_id},
+        {"$set": {"notifications_unread": 0}},
+        upsert=True,
+    )
     return jsonify({"message": "All notifications cleared."}), 200
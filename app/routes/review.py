@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify, request, g
 from app.utils.notify import create_notification
-from app.utils.auth_helpers import jwt_required, role_required
+from app.utils.auth_helpers import jwt_required, role_required, invalidate_user
 from app.extensions import mongo
+from app.utils.haunter_dashboard import record_review
 from bson import ObjectId
 from datetime import datetime
 
@@ -18,6 +19,23 @@ def ping():
     return jsonify({"message": "Review blueprint active!"}), 200
 
 
+def parse_rating(value):
+    """Whole-star rating from 1 to 5 (4, 4.0 or "4"), else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        value = int(value) if value.is_integer() else None
+    elif isinstance(value, str):
+        try:
+            value = int(value.strip())
+        except ValueError:
+            return None
+
+    if not isinstance(value, int) or not 1 <= value <= 5:
+        return None
+    return value
+
+
 # Haunter posts a review for an agent
 @bp.route("", methods=["POST"])
 @jwt_required()
@@ -37,6 +55,10 @@ def create_review():
     except:
         return jsonify({"error": "Invalid agent id"}), 400
 
+    rating = parse_rating(rating)
+    if rating is None:
+        return jsonify({"error": "rating must be a number from 1 to 5"}), 400
+
     existing = mongo.db.reviews.find_one({
         "agent_id": agent_obj,
         "reviewer_id": g.user["_id"]
@@ -45,12 +67,25 @@ def create_review():
     if existing:
         return jsonify({"error": "You already reviewed this agent"}), 400
 
-    mongo.db.reviews.insert_one({
+    review = {
         "agent_id": agent_obj,
         "reviewer_id": g.user["_id"],
         "rating": rating,
         "comment": comment,
         "created_at": datetime.utcnow()
-    })
+    }
+    mongo.db.reviews.insert_one(review)
+    record_review(g.user["_id"], review)
+
+    # Keep the agent's rating aggregates in step so readers never scan reviews
+    mongo.db.users.update_one(
+        {"_id": agent_obj},
+        {"$inc": {
+            "rating_sum": rating,
+            "rating_count": 1,
+            f"rating_histogram.{rating}": 1,
+        }}
+    )
+    invalidate_user(agent_obj)
 
     return jsonify({"message": "Review submitted"}), 201
\ No newline at end of file
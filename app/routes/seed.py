@@ -4,6 +4,7 @@ from werkzeug.security import generate_password_hash
 from bson import ObjectId
 import os
 from datetime import datetime
+from app.utils.search import search_fields
 
 bp = Blueprint("seed", __name__, url_prefix="/api/seed")
 
@@ -75,6 +76,8 @@ def seed_data():
             "created_at": datetime.utcnow()
         }
 
+        for house in (house1, house2):
+            house.update(search_fields(house["title"], house["location"], house["description"]))
         mongo.db.houses.insert_many([house1, house2])
 
         # Create review
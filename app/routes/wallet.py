@@ -1,8 +1,14 @@
 # app/routes/wallet.py
 from flask import Blueprint, jsonify, request, g
 from datetime import datetime
+from pymongo import ReturnDocument
 from app.extensions import mongo
 from app.utils.auth_helpers import jwt_required
+from app.utils.query_stats import query_budget
+from app.utils.lookups import usernames_by_id
+from app.utils.haunter_dashboard import record_wallet
+from app.utils.cache import agent_dashboard_cache
+from app.utils.search import SEARCH_PROJECTION
 
 from app.models import (
     Wallet,
@@ -47,22 +53,21 @@ def top_up_wallet():
     # Free mode: give a large balance regardless of input
     free_amount = 100000  # arbitrary large amount for testing
 
-    # Fetch existing wallet or create new one
-    wallet = mongo.db.wallets.find_one({"user_id": user_id})
-    if wallet:
-        new_balance = wallet.get("balance", 0) + free_amount
-        mongo.db.wallets.update_one(
-            {"_id": wallet["_id"]}, 
-            {"$set": {"balance": new_balance, "updated_at": datetime.utcnow()}}
-        )
-    else:
-        new_balance = free_amount
-        mongo.db.wallets.insert_one({
-            "user_id": user_id,
-            "balance": new_balance,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        })
+    # One atomic upsert, so concurrent top-ups can't overwrite each other
+    now = datetime.utcnow()
+    wallet = mongo.db.wallets.find_one_and_update(
+        {"user_id": user_id},
+        {
+            "$inc": {"balance": free_amount},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"created_at": now},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    new_balance = wallet["balance"]
+    record_wallet(user_id, wallet)
+    agent_dashboard_cache.delete(str(user_id))
 
     # Record transaction for logging purposes
     mongo.db.transactions.insert_one({
@@ -82,17 +87,20 @@ def top_up_wallet():
 
 # View all approved houses (for haunters)
 @bp.route("/houses", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_all_houses():
     if g.user.get("role") != "haunter":
         return jsonify({"error": "Access denied. Only haunters allowed."}), 403
 
     query = {"status": "approved"}
-    houses = list(mongo.db.houses.find(query).sort("created_at", -1))
+    houses = list(mongo.db.houses.find(query, SEARCH_PROJECTION).sort("created_at", -1))
+
+    agent_names = usernames_by_id(h.get("agent_id") for h in houses)
 
     results = []
     for h in houses:
-        agent = mongo.db.users.find_one({"_id": h.get("agent_id")})
+        agent_id = h.get("agent_id")
         results.append({
             "id": str(h["_id"]),
             "title": h.get("title"),
@@ -101,8 +109,8 @@ def get_all_houses():
             "price": h.get("price"),
             "image_url": h.get("image_path"),
             "agent": {
-                "id": str(agent["_id"]) if agent else None,
-                "name": agent["username"] if agent else "Unknown Agent"
+                "id": str(agent_id) if agent_id in agent_names else None,
+                "name": agent_names.get(agent_id, "Unknown Agent")
             },
             "created_at": h.get("created_at")
         })
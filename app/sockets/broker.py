@@ -0,0 +1,220 @@
+# app/sockets/broker.py
+"""
+Cross-process fan-out for Socket.IO over a Unix domain socket.
+
+UnixSocketBroker is a tiny relay: every frame a publisher sends is copied to
+every connected subscriber. UnixSocketManager plugs into python-socketio as
+a pub/sub client manager, so each worker process publishes its emits to the
+broker and replays everything it receives to its own connected clients.
+
+This keeps several workers on one host in sync without extra
+infrastructure. For multiple hosts, point SOCKETIO_MESSAGE_QUEUE at a
+redis:// (or other kombu) URL instead.
+"""
+import logging
+import os
+import socket
+import struct
+import threading
+
+import socketio
+from bson import json_util
+
+HEADER = struct.Struct("!I")
+ROLE_PUBLISHER = b"PUB"
+ROLE_SUBSCRIBER = b"SUB"
+
+logger = logging.getLogger("socketio")
+
+
+def send_frame(sock, payload):
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    buf = b""
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def read_frame(sock):
+    """Return the next frame's payload, or None once the peer has closed."""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    return _recv_exact(sock, HEADER.unpack(header)[0])
+
+
+# ===============================
+# BROKER
+# ===============================
+class UnixSocketBroker:
+    def __init__(self, path):
+        self.path = path
+        self._server = None
+        self._subscribers = {}  # socket -> send lock
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+    def bind(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen()
+
+    def serve_forever(self):
+        if self._server is None:
+            self.bind()
+
+        while not self._closed.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                break
+
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            role = read_frame(conn)
+
+            if role == ROLE_SUBSCRIBER:
+                with self._lock:
+                    self._subscribers[conn] = threading.Lock()
+                # Subscribers never send after the handshake; wait for close
+                while conn.recv(1024):
+                    pass
+                return
+
+            while True:
+                payload = read_frame(conn)
+                if payload is None:
+                    return
+                self._broadcast(payload)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._subscribers.pop(conn, None)
+            conn.close()
+
+    def _broadcast(self, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+
+        for conn, send_lock in subscribers:
+            try:
+                with send_lock:
+                    send_frame(conn, payload)
+            except OSError:
+                with self._lock:
+                    self._subscribers.pop(conn, None)
+
+    def close(self):
+        self._closed.set()
+        if self._server is not None:
+            self._server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+# ===============================
+# CLIENT MANAGER
+# ===============================
+def async_primitives(async_mode):
+    """
+    Socket module and lock factory that cooperate with the server's async
+    mode. Under eventlet/gevent (without monkey patching) plain stdlib
+    sockets and locks would block the whole hub, so use the green versions.
+    """
+    if async_mode == "eventlet":
+        from eventlet.green import socket as green_socket
+        from eventlet.semaphore import Semaphore
+        return green_socket, Semaphore
+
+    if async_mode and "gevent" in async_mode:
+        from gevent import socket as green_socket
+        from gevent.lock import Semaphore
+        return green_socket, Semaphore
+
+    return socket, threading.Lock
+
+
+class UnixSocketManager(socketio.PubSubManager):
+    name = "unix"
+
+    def __init__(self, path, channel="socketio", write_only=False, logger=None):
+        self.path = path
+        self._publisher = None
+        self._socket = socket
+        self._publish_lock = threading.Lock()
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+
+    def set_server(self, server):
+        super().set_server(server)
+        # server.async_mode is only assigned after set_server() returns
+        self._socket, lock_factory = async_primitives(server.eio.async_mode)
+        self._publish_lock = lock_factory()
+
+    def _connect(self, role):
+        sock = self._socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        send_frame(sock, role)
+        return sock
+
+    def _publish(self, data):
+        # bson's extended JSON keeps ObjectId/datetime payloads intact and,
+        # unlike pickle, never executes anything a local writer sends us
+        payload = json_util.dumps(data).encode()
+
+        with self._publish_lock:
+            # One reconnect attempt covers a broker restart between emits
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect(ROLE_PUBLISHER)
+                    send_frame(self._publisher, payload)
+                    return
+                except OSError:
+                    if self._publisher is not None:
+                        self._publisher.close()
+                    self._publisher = None
+                    if attempt:
+                        raise
+
+    def _listen(self):
+        retry_sleep = 1
+
+        while True:
+            try:
+                sock = self._connect(ROLE_SUBSCRIBER)
+            except OSError:
+                logger.error(
+                    "Cannot reach Socket.IO broker at %s, retrying in %s secs",
+                    self.path, retry_sleep
+                )
+                self.server.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+                continue
+
+            retry_sleep = 1
+
+            try:
+                while True:
+                    payload = read_frame(sock)
+                    if payload is None:
+                        break
+                    try:
+                        yield json_util.loads(payload)
+                    except ValueError:
+                        logger.error("Dropping malformed Socket.IO broker frame")
+            except OSError:
+                pass
+            finally:
+                sock.close()
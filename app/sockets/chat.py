@@ -1,36 +1,85 @@
-from flask import request, current_app
-from flask_socketio import join_room, emit
+from flask import request
+from flask_socketio import join_room, emit, disconnect
 from bson import ObjectId
 from datetime import datetime
+import time
 import jwt
 from app.extensions import socketio, mongo
+from app.utils.auth_helpers import decode_token, load_user
+from app.utils.chats import record_message, reset_unread
+from app.utils.notify import user_room
+from app.utils.metrics import timed_event
 
 
 # ===============================
-# HELPERS
+# CONNECTION SESSIONS
 # ===============================
+# sid -> {"user_id", "exp"}; filled once in the connect handler so events
+# don't have to decode the token or hit Mongo again.
+socket_sessions = {}
 
-def decode_socket_token():
-    auth = request.auth or {}
-    token = auth.get("token")
 
+@socketio.on("connect")
+@timed_event("connect")
+def on_connect(auth=None):
+    token = (auth or {}).get("token")
     if not token:
-        return None
+        return False
 
     try:
-        payload = jwt.decode(
-            token,
-            current_app.config["SECRET_KEY"],
-            algorithms=["HS256"]
-        )
+        payload = decode_token(token)
+    except jwt.InvalidTokenError:
+        return False
+
+    user = load_user(payload.get("user_id"))
+    if not user:
+        return False
+
+    socket_sessions[request.sid] = {
+        "user_id": user["_id"],
+        "exp": payload.get("exp"),
+    }
 
-        return mongo.db.users.find_one({
-            "_id": ObjectId(payload["user_id"])
-        })
+    # Personal room for pushed notifications
+    join_room(user_room(user["_id"]))
 
-    except Exception:
+
+@socketio.on("disconnect")
+@timed_event("disconnect")
+def on_disconnect():
+    socket_sessions.pop(request.sid, None)
+
+
+# ===============================
+# HELPERS
+# ===============================
+
+def current_socket_user():
+    """
+    Return the user bound to this socket, or disconnect it if the token has
+    expired or the account is gone.
+    """
+    session = socket_sessions.get(request.sid)
+    if not session:
         return None
 
+    if session["exp"] and session["exp"] <= time.time():
+        emit("error", {"error": "Token expired"})
+        disconnect()
+        return None
+
+    # Served from the in-process user cache; a miss re-validates against Mongo
+    user = load_user(session["user_id"])
+    if not user:
+        emit("error", {"error": "Unauthorized"})
+        disconnect()
+        return None
+
+    return user
+
+
+MAX_ACK_BATCH = 1000
+
 
 def safe_object_id(value):
     try:
@@ -51,8 +100,9 @@ def is_chat_participant(chat, user):
 # ===============================
 
 @socketio.on("join_chat")
+@timed_event("join_chat")
 def join_chat(data):
-    user = decode_socket_token()
+    user = current_socket_user()
     if not user:
         emit("error", {"error": "Unauthorized"})
         return
@@ -77,8 +127,9 @@ def join_chat(data):
 # ===============================
 
 @socketio.on("send_message")
+@timed_event("send_message")
 def send_message(data):
-    user = decode_socket_token()
+    user = current_socket_user()
     if not user:
         emit("error", {"error": "Unauthorized"})
         return
@@ -109,6 +160,7 @@ def send_message(data):
 
     result = mongo.db.messages.insert_one(message)
     message_id = result.inserted_id
+    record_message(chat, user["_id"], content, now)
 
     emit(
         "receive_message",
@@ -134,8 +186,9 @@ def send_message(data):
 # ===============================
 
 @socketio.on("message_delivered")
+@timed_event("message_delivered")
 def mark_message_delivered(data):
-    user = decode_socket_token()
+    user = current_socket_user()
     if not user:
         return
 
@@ -145,7 +198,8 @@ def mark_message_delivered(data):
 
     now = datetime.utcnow()
 
-    result = mongo.db.messages.update_one(
+    # One round trip: update and get chat_id back for the room
+    message = mongo.db.messages.find_one_and_update(
         {
             "_id": message_oid,
             "sender_id": {"$ne": user["_id"]},
@@ -153,11 +207,11 @@ def mark_message_delivered(data):
         },
         {
             "$set": {"delivered_at": now}
-        }
+        },
+        projection={"chat_id": 1}
     )
 
-    if result.modified_count > 0:
-        message = mongo.db.messages.find_one({"_id": message_oid})
+    if message:
         emit(
             "message_status_update",
             {
@@ -169,13 +223,89 @@ def mark_message_delivered(data):
         )
 
 
+# ===============================
+# MARK MESSAGES DELIVERED (BATCH)
+# ===============================
+
+@socketio.on("messages_delivered")
+@timed_event("messages_delivered")
+def mark_messages_delivered(data):
+    """
+    Ack many messages in one chat at once, either an explicit list
+    ({"chat_id", "message_ids": [...]}) or everything up to and including
+    one message ({"chat_id", "up_to": id}). Emits one status update.
+    """
+    user = current_socket_user()
+    if not user:
+        return
+
+    chat_oid = safe_object_id(data.get("chat_id"))
+    if not chat_oid:
+        emit("error", {"error": "Invalid chat id"})
+        return
+
+    message_ids = data.get("message_ids")
+    if message_ids is not None and not isinstance(message_ids, list):
+        emit("error", {"error": "message_ids must be a list"})
+        return
+
+    chat = mongo.db.chats.find_one(
+        {"_id": chat_oid},
+        {"agent_id": 1, "haunter_id": 1}
+    )
+    if not chat or not is_chat_participant(chat, user):
+        emit("error", {"error": "Access denied"})
+        return
+
+    query = {
+        "chat_id": chat_oid,
+        "sender_id": {"$ne": user["_id"]},
+        "delivered_at": None,
+    }
+    status = {"chat_id": str(chat_oid), "status": "delivered"}
+
+    up_to = safe_object_id(data.get("up_to"))
+
+    if message_ids:
+        oids = [
+            oid for oid in (safe_object_id(m) for m in message_ids[:MAX_ACK_BATCH])
+            if oid
+        ]
+        query["_id"] = {"$in": oids}
+        status["message_ids"] = [str(oid) for oid in oids]
+    elif up_to:
+        anchor = mongo.db.messages.find_one(
+            {"_id": up_to, "chat_id": chat_oid},
+            {"created_at": 1}
+        )
+        if not anchor:
+            emit("error", {"error": "Message not found"})
+            return
+
+        query["created_at"] = {"$lte": anchor["created_at"]}
+        status["up_to"] = str(up_to)
+    else:
+        emit("error", {"error": "message_ids or up_to required"})
+        return
+
+    now = datetime.utcnow()
+
+    result = mongo.db.messages.update_many(query, {"$set": {"delivered_at": now}})
+
+    if result.modified_count > 0:
+        status["delivered_at"] = now.isoformat()
+        status["count"] = result.modified_count
+        emit("messages_status_update", status, room=str(chat_oid))
+
+
 # ===============================
 # MARK CHAT AS READ (BULK)
 # ===============================
 
 @socketio.on("mark_chat_read")
+@timed_event("mark_chat_read")
 def mark_chat_read(data):
-    user = decode_socket_token()
+    user = current_socket_user()
     if not user:
         return
 
@@ -198,6 +328,7 @@ def mark_chat_read(data):
             }
         }
     )
+    reset_unread(chat_oid, user["_id"])
 
     emit(
         "chat_read_update",
@@ -1,12 +1,59 @@
 from functools import wraps
 from flask import request, jsonify, g
 import jwt
+import os
 from bson import ObjectId
 from app.extensions import mongo
+from app.utils.cache import TTLCache
 from flask import current_app
 from flask_jwt_extended import get_jwt_identity
 
 
+# ===============================
+# USER CACHE
+# ===============================
+# Authenticated users keyed by str(user_id). Writes to a user document must
+# call invalidate_user() so the next request sees the change.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_MAX_SIZE", 10000)),
+    ttl=int(os.getenv("USER_CACHE_TTL", 60)),
+)
+
+
+def load_user(user_id):
+    """Return the user document for user_id, served from the cache when fresh."""
+    key = str(user_id)
+    user = user_cache.get(key)
+
+    if user is None:
+        try:
+            oid = ObjectId(user_id)
+        except Exception:
+            return None
+
+        user = mongo.db.users.find_one({"_id": oid})
+        if not user:
+            return None
+
+        user_cache.set(key, user)
+
+    # Shallow copy so handlers that tweak g.user never leak into the cache
+    return dict(user)
+
+
+def invalidate_user(user_id):
+    user_cache.delete(str(user_id))
+
+
+def decode_token(token):
+    """Decode a login token; raises jwt.InvalidTokenError subclasses on failure."""
+    return jwt.decode(
+        token,
+        current_app.config["SECRET_KEY"],
+        algorithms=["HS256"]
+    )
+
+
 # ===============================
 # JWT REQUIRED
 # ===============================
@@ -22,19 +69,13 @@ def jwt_required():
             token = auth.split(" ")[1]
 
             try:
-                payload = jwt.decode(
-                    token,
-                    current_app.config["SECRET_KEY"],
-                    algorithms=["HS256"]
-                )
+                payload = decode_token(token)
             except jwt.ExpiredSignatureError:
                 return jsonify({"error": "Token expired"}), 401
             except jwt.InvalidTokenError:
                 return jsonify({"error": "Invalid token"}), 401
 
-            user = mongo.db.users.find_one(
-                {"_id": ObjectId(payload["user_id"])}
-            )
+            user = load_user(payload.get("user_id"))
 
             if not user:
                 return jsonify({"error": "User not found"}), 401
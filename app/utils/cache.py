@@ -0,0 +1,241 @@
+# app/utils/cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with a per-entry TTL and an LRU bound.
+
+    Each worker process holds its own copy, so entries are only as fresh as
+    their TTL once another worker writes.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def update(self, key, change):
+        """
+        Atomically replace a live entry's value with change(value), keeping
+        its original expiry. A missing or expired entry is left alone.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return
+
+            value, expires_at = entry
+            self._data[key] = (change(value), expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0,
+            }
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TaggedCache:
+    """
+    Cache for computed response payloads.
+
+    - Entries carry tags; invalidate_tag() drops every entry with that tag.
+    - Once an entry is older than ttl it is still served for up to stale_ttl
+      while a single background refresh recomputes it.
+    - Concurrent misses on the same key wait for one computation instead of
+      all hitting the database.
+
+    Misses run compute() in the calling thread. Stale refreshes run in a
+    background thread, so pass refresh= when compute needs context the
+    caller has but a bare thread lacks (e.g. a Flask app context).
+    """
+
+    def __init__(self, maxsize=256, ttl=10, stale_ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (value, tags, fresh_until, stale_until)
+        self._inflight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, tags=(), refresh=None):
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None:
+                value, _, fresh_until, stale_until = entry
+
+                if now < fresh_until:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                if now < stale_until:
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = _InFlight()
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, refresh or compute, tags, self._generation),
+                            daemon=True,
+                        ).start()
+                    return value
+
+                del self._data[key]
+
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+            generation = self._generation
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        self._refresh(key, compute, tags, generation)
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _refresh(self, key, compute, tags, generation):
+        with self._lock:
+            flight = self._inflight[key]
+
+        try:
+            flight.value = compute()
+        except Exception as e:
+            flight.error = e
+        else:
+            self._store(key, flight.value, tags, generation)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key, value, tags, generation):
+        now = time.monotonic()
+
+        with self._lock:
+            # A write invalidated the cache while we were computing; the
+            # result may predate it, so hand it back without caching.
+            if generation != self._generation:
+                return
+
+            self._data[key] = (
+                value,
+                frozenset(tags),
+                now + self.ttl,
+                now + self.ttl + self.stale_ttl,
+            )
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            self._generation += 1
+            for key in [k for k, entry in self._data.items() if tag in entry[1]]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
+
+
+# ===============================
+# SHARED RESPONSE CACHES
+# ===============================
+# Approved-house listing pages, tagged "houses". Each worker keeps its own
+# copy, so writes served by another worker show up after at most ttl+stale_ttl.
+listing_cache = TaggedCache(
+    maxsize=int(os.getenv("LISTING_CACHE_MAX_SIZE", 512)),
+    ttl=int(os.getenv("LISTING_CACHE_TTL", 10)),
+    stale_ttl=int(os.getenv("LISTING_CACHE_STALE_TTL", 30)),
+)
+
+# Agent dashboard summaries keyed by agent id. The agent's own writes drop
+# their entry; anything else (new requests, reviews) shows up within the TTL.
+agent_dashboard_cache = TTLCache(
+    maxsize=int(os.getenv("AGENT_DASHBOARD_CACHE_MAX_SIZE", 2048)),
+    ttl=int(os.getenv("AGENT_DASHBOARD_CACHE_TTL", 30)),
+)
@@ -0,0 +1,38 @@
+# app/utils/chats.py
+from app.extensions import mongo
+
+PREVIEW_LENGTH = 120
+
+
+def other_participant(chat, user_id):
+    return chat["haunter_id"] if chat.get("agent_id") == user_id else chat["agent_id"]
+
+
+def record_message(chat, sender_id, content, sent_at):
+    """
+    Bump the recipient's unread counter and the last-message preview on the
+    chat document so the inbox never has to count messages.
+    """
+    recipient_id = other_participant(chat, sender_id)
+
+    mongo.db.chats.update_one(
+        {"_id": chat["_id"]},
+        {
+            "$inc": {f"unread_counts.{recipient_id}": 1},
+            "$set": {
+                "last_message": {
+                    "sender_id": sender_id,
+                    "content": content[:PREVIEW_LENGTH],
+                    "created_at": sent_at,
+                },
+                "last_message_at": sent_at,
+            },
+        }
+    )
+
+
+def reset_unread(chat_id, user_id):
+    mongo.db.chats.update_one(
+        {"_id": chat_id, "$or": [{"agent_id": user_id}, {"haunter_id": user_id}]},
+        {"$set": {f"unread_counts.{user_id}": 0}}
+    )
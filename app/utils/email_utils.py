@@ -1,32 +1,80 @@
+import os
+
+import requests
 from flask_mail import Message
 from flask import current_app
 from app import mail
+from app.utils.jobs import job, enqueue
+from app.utils.metrics import track_outbound
+
+RESEND_URL = "https://api.resend.com/emails"
+
 
-def send_email(subject, recipients, body, html=None):
+def send_email(subject, recipients, body, html=None, idempotency_key=None):
     """
-    Send an email using Flask-Mail.
+    Queue an email to be sent with Flask-Mail by a background worker.
 
     Args:
         subject (str): Email subject
         recipients (list[str]): List of recipient emails
         body (str): Plain text content
         html (str, optional): HTML content for rich emails
+        idempotency_key (str, optional): Queue the email at most once per key
     """
     if not recipients:
         current_app.logger.warning("No recipients provided for email: %s", subject)
         return False
 
+    enqueue("send_email", {
+        "subject": subject,
+        "recipients": list(recipients),
+        "body": body,
+        "html": html,
+    }, idempotency_key=idempotency_key)
+    return True
+
+
+@job("send_email")
+def deliver_email(payload):
     msg = Message(
-        subject=subject,
-        recipients=recipients,
-        body=body,
-        html=html
+        subject=payload["subject"],
+        recipients=payload["recipients"],
+        body=payload["body"],
+        html=payload.get("html")
     )
 
-    try:
+    # Exceptions propagate so the job is retried
+    with track_outbound("smtp"):
         mail.send(msg)
-        current_app.logger.info("Email sent to: %s", recipients)
-        return True
-    except Exception as e:
-        current_app.logger.error("Failed to send email: %s", e)
-        return False
+    current_app.logger.info("Email sent to: %s", payload["recipients"])
+
+
+def send_resend_email(to, subject, html, idempotency_key=None):
+    """Queue an email sent through the Resend API."""
+    return enqueue("send_resend_email", {
+        "to": list(to),
+        "subject": subject,
+        "html": html,
+    }, idempotency_key=idempotency_key)
+
+
+@job("send_resend_email")
+def deliver_resend_email(payload):
+    with track_outbound("resend"):
+        response = requests.post(
+            RESEND_URL,
+            headers={
+                "Authorization": f"Bearer {os.getenv('RESEND_API_KEY')}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "from": "onboarding@resend.dev",
+                "to": payload["to"],
+                "subject": payload["subject"],
+                "html": payload["html"],
+            },
+            timeout=10
+        )
+
+    if response.status_code >= 400:
+        raise RuntimeError(f"Resend API error {response.status_code}: {response.text}")
@@ -0,0 +1,42 @@
+# app/utils/favorites.py
+import os
+
+from app.extensions import mongo
+from app.utils.cache import TTLCache
+
+# user id -> frozenset of favorited house ObjectIds. Each worker keeps its own
+# copy and updates it on add/remove; changes made through another worker show
+# up once the entry expires.
+favorite_sets = TTLCache(
+    maxsize=int(os.getenv("FAVORITES_CACHE_MAX_SIZE", 10000)),
+    ttl=int(os.getenv("FAVORITES_CACHE_TTL", 60)),
+)
+
+
+def favorite_house_ids(user_id):
+    """Every house id the user has favorited, loaded with one query on a miss."""
+    key = str(user_id)
+    ids = favorite_sets.get(key)
+
+    if ids is None:
+        ids = frozenset(
+            fav["house_id"]
+            for fav in mongo.db.favorites.find({"haunter_id": user_id}, {"_id": 0, "house_id": 1})
+        )
+        favorite_sets.set(key, ids)
+
+    return ids
+
+
+def _update_cached(user_id, change):
+    # Only patch a set that is already cached; a miss reloads from Mongo anyway.
+    # The patch keeps the entry's expiry so other workers' changes still land.
+    favorite_sets.update(str(user_id), change)
+
+
+def cache_favorite_added(user_id, house_id):
+    _update_cached(user_id, lambda ids: ids | {house_id})
+
+
+def cache_favorite_removed(user_id, house_id):
+    _update_cached(user_id, lambda ids: ids - {house_id})
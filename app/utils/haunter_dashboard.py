@@ -0,0 +1,215 @@
+# app/utils/haunter_dashboard.py
+"""
+Per-haunter dashboard read model in the haunter_dashboards collection.
+
+One document per haunter (_id = user id) holding the most recent requested
+houses and reviews, running totals and a wallet snapshot, so the dashboard
+is a single find_one. The writers (contact_agent, create_review, wallet
+top-ups, house edits) patch it in place; a missing document is built from
+the source collections on first read, and `flask rebuild-haunter-dashboards`
+repairs drift.
+
+Writers never upsert: if the document doesn't exist yet, the next read
+builds it from scratch and will include the write. Every writer also bumps
+`version`, and a build only stores its snapshot if the version it started
+from is unchanged, retrying otherwise. A first build claims the _id with a
+`pending` placeholder before computing, so a write that lands mid-build
+bumps the placeholder instead of matching nothing and being lost.
+
+Requests for a deleted house stay listed and counted, with the house fields
+cleared; record_house_deleted does the same to stored dashboards.
+"""
+from datetime import datetime
+
+from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from app.extensions import mongo
+
+RECENT_LIMIT = 20
+BUILD_ATTEMPTS = 5
+
+
+def request_entry(request_id, house, created_at):
+    return {
+        "request_id": request_id,
+        "house_id": house["_id"],
+        "title": house.get("title"),
+        "location": house.get("location"),
+        "price": house.get("price"),
+        "agent_id": house.get("agent_id"),
+        "created_at": created_at,
+    }
+
+
+def review_entry(review):
+    return {
+        "agent_id": review["agent_id"],
+        "rating": review["rating"],
+        "comment": review.get("comment", ""),
+        "created_at": review.get("created_at"),
+    }
+
+
+def wallet_snapshot(wallet):
+    return {
+        "balance": wallet.get("balance", 0) if wallet else 0,
+        "updated_at": wallet.get("updated_at") if wallet else None,
+    }
+
+
+def _push_recent(entry):
+    # Newest first, capped so the document stays small
+    return {"$each": [entry], "$position": 0, "$slice": RECENT_LIMIT}
+
+
+# ===============================
+# WRITERS
+# ===============================
+def record_contact_request(haunter_id, entry, wallet=None, session=None):
+    update = {
+        "$push": {"recent_requests": _push_recent(entry)},
+        "$inc": {"total_requests": 1, "version": 1},
+        "$set": {"updated_at": datetime.utcnow()},
+    }
+    if wallet is not None:
+        update["$set"]["wallet"] = wallet_snapshot(wallet)
+
+    mongo.db.haunter_dashboards.update_one({"_id": haunter_id}, update, session=session)
+
+
+def record_review(haunter_id, review, session=None):
+    mongo.db.haunter_dashboards.update_one(
+        {"_id": haunter_id},
+        {
+            "$push": {"recent_reviews": _push_recent(review_entry(review))},
+            "$inc": {"total_reviews": 1, "version": 1},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        session=session,
+    )
+
+
+def record_wallet(user_id, wallet, session=None):
+    mongo.db.haunter_dashboards.update_one(
+        {"_id": user_id},
+        {
+            "$set": {"wallet": wallet_snapshot(wallet), "updated_at": datetime.utcnow()},
+            "$inc": {"version": 1},
+        },
+        session=session,
+    )
+
+
+def record_house_update(house):
+    """Refresh the denormalised house fields in every dashboard that lists it."""
+    mongo.db.haunter_dashboards.update_many(
+        {"recent_requests.house_id": house["_id"]},
+        {"$set": {
+            "recent_requests.$[r].title": house.get("title"),
+            "recent_requests.$[r].location": house.get("location"),
+            "recent_requests.$[r].price": house.get("price"),
+        }, "$inc": {"version": 1}},
+        array_filters=[{"r.house_id": house["_id"]}],
+    )
+
+
+def record_house_deleted(house_id):
+    """Clear the house fields of requests for a deleted house, as a rebuild would."""
+    mongo.db.haunter_dashboards.update_many(
+        {"recent_requests.house_id": house_id},
+        {"$set": {
+            "recent_requests.$[r].title": None,
+            "recent_requests.$[r].location": None,
+            "recent_requests.$[r].price": None,
+        }, "$inc": {"version": 1}},
+        array_filters=[{"r.house_id": house_id}],
+    )
+
+
+# ===============================
+# BUILD / READ
+# ===============================
+def compute_dashboard(haunter_id):
+    """Recompute a haunter's dashboard from the source collections."""
+    requests = mongo.db.contact_requests.aggregate([
+        {"$match": {"haunter_id": haunter_id}},
+        {"$sort": {"created_at": DESCENDING, "_id": DESCENDING}},
+        {"$lookup": {
+            "from": "houses",
+            "localField": "house_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"title": 1, "location": 1, "price": 1, "agent_id": 1}}],
+            "as": "house",
+        }},
+        # Keep requests whose house was deleted; the writers counted them too
+        {"$unwind": {"path": "$house", "preserveNullAndEmptyArrays": True}},
+        {"$facet": {
+            "recent": [{"$limit": RECENT_LIMIT}],
+            "total": [{"$count": "n"}],
+        }},
+    ]).next()
+
+    reviews = mongo.db.reviews.aggregate([
+        {"$match": {"reviewer_id": haunter_id}},
+        {"$sort": {"created_at": DESCENDING, "_id": DESCENDING}},
+        {"$facet": {
+            "recent": [{"$limit": RECENT_LIMIT}],
+            "total": [{"$count": "n"}],
+        }},
+    ]).next()
+
+    wallet = mongo.db.wallets.find_one({"user_id": haunter_id}, {"balance": 1, "updated_at": 1})
+
+    dashboard = {
+        "_id": haunter_id,
+        "recent_requests": [
+            request_entry(
+                r["_id"],
+                r.get("house") or {"_id": r["house_id"], "agent_id": r.get("agent_id")},
+                r.get("created_at"),
+            )
+            for r in requests["recent"]
+        ],
+        "total_requests": requests["total"][0]["n"] if requests["total"] else 0,
+        "recent_reviews": [review_entry(r) for r in reviews["recent"]],
+        "total_reviews": reviews["total"][0]["n"] if reviews["total"] else 0,
+        "wallet": wallet_snapshot(wallet),
+        "updated_at": datetime.utcnow(),
+    }
+    return dashboard
+
+
+def build_dashboard(haunter_id):
+    """
+    Recompute a haunter's dashboard and store it, unless a writer touched
+    the document while computing; then start over from the new version.
+    """
+    dashboards = mongo.db.haunter_dashboards
+
+    for _ in range(BUILD_ATTEMPTS):
+        current = dashboards.find_one({"_id": haunter_id}, {"version": 1})
+        if current is None:
+            try:
+                dashboards.insert_one({"_id": haunter_id, "pending": True, "version": 0})
+            except DuplicateKeyError:
+                continue
+            version = 0
+        else:
+            # Documents built before versioning have no field; None matches that
+            version = current.get("version")
+
+        dashboard = {**compute_dashboard(haunter_id), "version": version}
+        if dashboards.replace_one({"_id": haunter_id, "version": version}, dashboard).matched_count:
+            return dashboard
+
+    # Still contended: serve this snapshot; a pending placeholder is rebuilt
+    # by the next read
+    return dashboard
+
+
+def get_dashboard(haunter_id):
+    dashboard = mongo.db.haunter_dashboards.find_one({"_id": haunter_id})
+    if dashboard is not None and not dashboard.get("pending"):
+        return dashboard
+    return build_dashboard(haunter_id)
@@ -1,17 +1,91 @@
+import math
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import cloudinary
 import cloudinary.uploader
+from flask import current_app
+
+from app.utils.metrics import track_outbound
+
+UPLOAD_TIMEOUT = int(os.getenv("IMAGE_UPLOAD_TIMEOUT", 30))
+UPLOAD_WORKERS = int(os.getenv("IMAGE_UPLOAD_WORKERS", 4))
+
+
+class ImageUploader(ABC):
+    """
+    Interface for house image storage. Set app.config["IMAGE_UPLOADER"] to
+    a subclass instance to swap the backend (e.g. in tests).
+    """
+
+    @abstractmethod
+    def upload(self, file, public_id, timeout=None):
+        """Store one image and return its public URL."""
+
+
+class CloudinaryUploader(ImageUploader):
+    def upload(self, file, public_id, timeout=None):
+        with track_outbound("cloudinary"):
+            result = cloudinary.uploader.upload(
+                file,
+                folder="house_images",
+                public_id=public_id,
+                overwrite=True,
+                resource_type="image",
+                timeout=timeout,
+            )
+
+        return result["secure_url"]
+
 
-def upload_house_image(file, public_id_prefix):
+default_uploader = CloudinaryUploader()
+
+
+def get_uploader():
+    return current_app.config.get("IMAGE_UPLOADER") or default_uploader
+
+
+def upload_house_images(files, public_id_prefix, uploader=None,
+                        timeout=UPLOAD_TIMEOUT, max_workers=UPLOAD_WORKERS):
     """
-    Uploads image to Cloudinary and returns secure URL
+    Upload several images concurrently through a bounded thread pool.
+
+    Returns (urls, failures): urls keep the order of `files`, failures is a
+    list of {"filename", "error"} for uploads that raised or timed out.
     """
-    result = cloudinary.uploader.upload(
-        file,
-        folder="house_images",
-        public_id=public_id_prefix,
-        overwrite=True,
-        resource_type="image",
-    )
+    if not files:
+        return [], []
+
+    uploader = uploader or get_uploader()
+    workers = max(1, min(max_workers, len(files)))
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [
+        executor.submit(uploader.upload, file, f"{public_id_prefix}_{i}", timeout)
+        for i, file in enumerate(files)
+    ]
+
+    # Uploads beyond the pool size queue behind earlier ones, so allow one
+    # timeout per "round" of the pool before giving up on stragglers.
+    _, not_done = wait(futures, timeout=timeout * math.ceil(len(files) / workers))
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    urls = []
+    failures = []
+
+    for file, future in zip(files, futures):
+        filename = getattr(file, "filename", None)
+
+        if future in not_done:
+            failures.append({"filename": filename, "error": "Upload timed out"})
+            continue
+
+        error = future.exception()
+        if error is not None:
+            failures.append({"filename": filename, "error": str(error)})
+            continue
 
-    return result["secure_url"]
+        urls.append(future.result())
 
+    return urls, failures
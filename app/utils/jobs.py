@@ -0,0 +1,234 @@
+# app/utils/jobs.py
+"""
+Durable background jobs stored in the `jobs` collection.
+
+- enqueue() inserts a job; an idempotency_key makes repeats a no-op.
+- Each worker process runs a small thread pool that claims due jobs with an
+  atomic find_one_and_update, so several processes can share one queue.
+- A failing job is retried with exponential backoff until max_attempts,
+  then left with status "dead" for inspection (flask jobs-retry-dead).
+- A job whose worker died mid-run is reclaimed once its lease expires.
+- drain() runs due jobs in the calling thread so tests stay deterministic.
+"""
+import os
+import random
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.extensions import mongo
+from app.utils.metrics import jobs_processed, job_duration
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 5      # seconds before the first retry
+BACKOFF_MAX = 3600
+LEASE_SECONDS = 300   # a running job is reclaimed after this long
+
+handlers = {}
+
+# Set by enqueue() so idle workers in this process pick new jobs up at once
+_wakeup = threading.Event()
+
+
+def job(name):
+    """Register a job handler: `@job("send_email") def send(payload): ...`"""
+    def decorator(fn):
+        handlers[name] = fn
+        return fn
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, delay=0,
+            max_attempts=MAX_ATTEMPTS, session=None):
+    """
+    Queue a job and return its id. With an idempotency_key, enqueueing the
+    same key again returns the existing job instead of adding another.
+    """
+    now = datetime.utcnow()
+    doc = {
+        "name": name,
+        "payload": payload or {},
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_at": now + timedelta(seconds=delay),
+        "created_at": now,
+    }
+    if idempotency_key is not None:
+        doc["idempotency_key"] = idempotency_key
+
+    while True:
+        try:
+            job_id = mongo.db.jobs.insert_one(doc, session=session).inserted_id
+            break
+        except DuplicateKeyError:
+            existing = mongo.db.jobs.find_one(
+                {"idempotency_key": idempotency_key}, {"_id": 1}, session=session
+            )
+            if existing is not None:
+                return existing["_id"]
+            # The conflicting job was removed in between; try the insert again
+            doc.pop("_id", None)
+
+    _wakeup.set()
+    return job_id
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_job(now=None):
+    """Atomically take the oldest due job (or one with an expired lease)."""
+    now = now or datetime.utcnow()
+
+    return mongo.db.jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "run_at": {"$lte": now}},
+            {"status": "running", "locked_until": {"$lt": now}},
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "locked_until": now + timedelta(seconds=LEASE_SECONDS),
+                "started_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def run_job(doc, now=None):
+    """Run a claimed job and record the outcome; returns the new status."""
+    handler = handlers.get(doc["name"])
+    started = time.perf_counter()
+
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job {doc['name']!r}")
+        handler(doc["payload"])
+    except Exception as e:
+        status = _record_failure(doc, e, now, retry=handler is not None)
+    else:
+        mongo.db.jobs.update_one(
+            {"_id": doc["_id"]},
+            {
+                "$set": {"status": "done", "finished_at": datetime.utcnow()},
+                "$unset": {"locked_until": ""},
+            },
+        )
+        status = "done"
+
+    jobs_processed.inc(job=doc["name"], outcome=status)
+    job_duration.observe(time.perf_counter() - started, job=doc["name"])
+    return status
+
+
+def _record_failure(doc, error, now, retry=True):
+    now = now or datetime.utcnow()
+    fields = {
+        "last_error": f"{type(error).__name__}: {error}",
+        "failed_at": now,
+    }
+
+    if retry and doc["attempts"] < doc.get("max_attempts", MAX_ATTEMPTS):
+        status = "queued"
+        fields["run_at"] = now + timedelta(seconds=backoff(doc["attempts"]))
+    else:
+        status = "dead"
+        current_app.logger.error(
+            "Job %s (%s) dead after %s attempts:\n%s",
+            doc["_id"], doc["name"], doc["attempts"],
+            "".join(traceback.format_exception(error)),
+        )
+
+    fields["status"] = status
+    mongo.db.jobs.update_one(
+        {"_id": doc["_id"]},
+        {"$set": fields, "$unset": {"locked_until": ""}},
+    )
+    return status
+
+
+def drain(now=None, limit=1000):
+    """
+    Run every job due at `now` in the calling thread and return how many ran.
+    Needs an app context. Pass a later `now` to fast-forward past retries.
+    """
+    ran = 0
+    while ran < limit:
+        doc = claim_job(now)
+        if doc is None:
+            break
+        run_job(doc, now)
+        ran += 1
+    return ran
+
+
+# ===============================
+# WORKER POOL
+# ===============================
+class JobWorkerPool:
+    def __init__(self, app, workers=2, poll_interval=1.0):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._threads = []
+        self._stopped = threading.Event()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopped.set()
+        _wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                with self.app.app_context():
+                    doc = claim_job()
+                    if doc is not None:
+                        run_job(doc)
+                        continue
+            except Exception:
+                self.app.logger.exception("Job worker error")
+
+            _wakeup.wait(self.poll_interval)
+            _wakeup.clear()
+
+
+def init_jobs(app):
+    """
+    Start the in-process worker pool on the first request, i.e. after
+    gunicorn has forked, so every worker process gets its own threads.
+    JOB_WORKERS=0 disables it (tests drain explicitly; or run
+    `flask jobs-worker` as a separate process).
+    """
+    workers = int(os.getenv("JOB_WORKERS", 2))
+    if workers <= 0:
+        return
+
+    pool = JobWorkerPool(app, workers=workers)
+    lock = threading.Lock()
+    started = []
+
+    @app.before_request
+    def start_job_workers():
+        if started:
+            return
+        with lock:
+            if not started:
+                pool.start()
+                started.append(pool)
@@ -0,0 +1,46 @@
+# app/utils/ledger.py
+from datetime import datetime
+from pymongo import ReturnDocument
+from app.extensions import mongo
+
+
+class InsufficientCredits(Exception):
+    pass
+
+
+def spend_credits(user_id, amount, description, session=None):
+    """
+    Atomically deduct `amount` from the user's wallet and record the
+    transaction.
+
+    The balance check and the decrement are one conditional $inc, so
+    concurrent spends can never overdraw or lose an update. Pass a session
+    to make this part of a larger multi-document transaction.
+
+    Raises InsufficientCredits when the balance is too low.
+    Returns the updated wallet document.
+    """
+    now = datetime.utcnow()
+
+    wallet = mongo.db.wallets.find_one_and_update(
+        {"user_id": user_id, "balance": {"$gte": amount}},
+        {
+            "$inc": {"balance": -amount, "credits_spent": amount},
+            "$set": {"updated_at": now},
+        },
+        return_document=ReturnDocument.AFTER,
+        session=session,
+    )
+
+    if wallet is None:
+        raise InsufficientCredits()
+
+    mongo.db.transactions.insert_one({
+        "user_id": user_id,
+        "amount": -amount,
+        "txn_type": "deduction",
+        "description": description,
+        "created_at": now,
+    }, session=session)
+
+    return wallet
@@ -0,0 +1,18 @@
+# app/utils/lookups.py
+from app.extensions import mongo
+
+
+def usernames_by_id(user_ids):
+    """
+    Resolve many user ids to usernames in a single $in query.
+
+    Returns a dict of {ObjectId: username}; unknown ids are simply absent.
+    """
+    ids = list({uid for uid in user_ids if uid is not None})
+    if not ids:
+        return {}
+
+    return {
+        u["_id"]: u.get("username")
+        for u in mongo.db.users.find({"_id": {"$in": ids}}, {"username": 1})
+    }
@@ -0,0 +1,250 @@
+# app/utils/metrics.py
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Each worker process keeps its own registry, so scrape every worker (or
+aggregate in Prometheus) when running more than one.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_sample(self, key, state):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self._add(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs):
+        return self._add(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self._add(Histogram(*args, **kwargs))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.",
+    ["endpoint", "method", "status"],
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+)
+mongo_request_duration = registry.histogram(
+    "mongo_request_duration_seconds", "Time spent in Mongo per HTTP request.",
+    ["endpoint"],
+)
+mongo_commands_per_request = registry.histogram(
+    "mongo_commands_per_request", "Mongo commands issued per HTTP request.",
+    ["endpoint"], buckets=COUNT_BUCKETS,
+)
+outbound_request_duration = registry.histogram(
+    "outbound_request_duration_seconds", "Latency of calls to external services.",
+    ["service", "outcome"],
+)
+socketio_events = registry.counter(
+    "socketio_events_total", "Socket.IO events handled.",
+    ["event"],
+)
+socketio_event_duration = registry.histogram(
+    "socketio_event_duration_seconds", "Socket.IO event handler duration.",
+    ["event"],
+)
+jobs_processed = registry.counter(
+    "jobs_processed_total", "Background job attempts, by resulting status.",
+    ["job", "outcome"],
+)
+job_duration = registry.histogram(
+    "job_duration_seconds", "Background job handler duration.",
+    ["job"],
+)
+
+
+@contextmanager
+def track_outbound(service):
+    """Time a call to an external service (cloudinary, resend, smtp)."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        outbound_request_duration.observe(
+            time.perf_counter() - started, service=service, outcome=outcome
+        )
+
+
+def timed_event(event):
+    """Count and time a Socket.IO handler; put it under @socketio.on."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                socketio_events.inc(event=event)
+                socketio_event_duration.observe(time.perf_counter() - started, event=event)
+        return wrapper
+    return decorator
+
+
+def _observe_request(status):
+    endpoint = request.endpoint or "unmatched"
+    http_request_duration.observe(
+        time.perf_counter() - g.metrics_started,
+        endpoint=endpoint, method=request.method, status=status,
+    )
+
+    stats = g.get("db_stats")
+    if stats is not None:
+        mongo_request_duration.observe(stats.total_ms / 1000, endpoint=endpoint)
+        mongo_commands_per_request.observe(stats.count, endpoint=endpoint)
+
+    g.metrics_observed = True
+
+
+def init_metrics(app):
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        http_requests_in_flight.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        if "metrics_started" in g:
+            _observe_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if "metrics_started" not in g:
+            return
+
+        http_requests_in_flight.dec()
+
+        # after_request is skipped when the view raised
+        if not g.get("metrics_observed"):
+            _observe_request(500)
@@ -1,10 +1,96 @@
-﻿# app/utils/notify.py
+# app/utils/notify.py
 from app import mongo
+from app.extensions import socketio
 from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
+from flask import current_app
+
+
+def user_room(user_id):
+    """Socket.IO room every connection of a user joins on connect."""
+    return f"user:{user_id}"
+
+
+def serialize_notification(n):
+    return {
+        "id": str(n["_id"]),
+        "message": n.get("message"),
+        "is_read": n.get("is_read", False),
+        "created_at": n.get("created_at"),
+    }
+
+
+def change_unread_count(user_id, delta):
+    """Adjust the maintained unread counter and return the new value."""
+    counters = mongo.db.counters.find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {"notifications_unread": delta}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        projection={"notifications_unread": 1},
+    )
+    return counters.get("notifications_unread", 0)
+
+
+def get_unread_count(user_id):
+    counters = mongo.db.counters.find_one({"_id": user_id}, {"notifications_unread": 1})
+
+    if counters is None or "notifications_unread" not in counters:
+        # Migration 0009 seeded every user with unread notifications, so
+        # this only covers a counter that was never written
+        unread = mongo.db.notifications.count_documents({"user_id": user_id, "is_read": False})
+        mongo.db.counters.update_one(
+            {"_id": user_id},
+            {"$set": {"notifications_unread": unread}},
+            upsert=True,
+        )
+        return unread
+
+    return max(0, counters["notifications_unread"])
+
+
+def recount_unread_counters(db, batch_size=500):
+    """Reset every notifications_unread counter from the notifications; returns users counted."""
+    db.counters.update_many({}, {"$set": {"notifications_unread": 0}})
+
+    ops = [
+        UpdateOne({"_id": row["_id"]}, {"$set": {"notifications_unread": row["count"]}}, upsert=True)
+        for row in db.notifications.aggregate([
+            {"$match": {"is_read": False}},
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+        ])
+    ]
+    for i in range(0, len(ops), batch_size):
+        db.counters.bulk_write(ops[i:i + batch_size], ordered=False)
+
+    return len(ops)
+
+
+def build_notification(user_id, message):
+    return {
+        "user_id": user_id,
+        "message": message,
+        "is_read": False,
+        "created_at": datetime.utcnow()
+    }
+
+
+def publish_notification(notif, unread_count=None):
+    """Push a notification to the user's live sockets; never fails the caller."""
+    payload = serialize_notification(notif)
+    payload["created_at"] = notif["created_at"].isoformat()
+    if unread_count is not None:
+        payload["unread_count"] = unread_count
+
+    try:
+        socketio.emit("notification", payload, room=user_room(notif["user_id"]))
+    except Exception as e:
+        current_app.logger.error("Failed to push notification: %s", e)
+
 
 def create_notification(user_id, message):
     """
-    Create a notification for a user in MongoDB.
+    Create a notification for a user in MongoDB and push it over Socket.IO.
 
     Args:
         user_id (ObjectId or str): ID of the user to notify.
@@ -13,13 +99,9 @@ def create_notification(user_id, message):
     Returns:
         dict: The inserted notification document.
     """
-    notif = {
-        "user_id": user_id,
-        "message": message,
-        "is_read": False,
-        "created_at": datetime.utcnow()
-    }
+    notif = build_notification(user_id, message)
     result = mongo.db.notifications.insert_one(notif)
     notif["_id"] = result.inserted_id
-    return notif
 
+    publish_notification(notif, change_unread_count(user_id, 1))
+    return notif
@@ -0,0 +1,73 @@
+# app/utils/pagination.py
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from bson import ObjectId, json_util
+from pymongo import DESCENDING
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Clamp a ?limit= query value to 1..maximum, falling back to default."""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(data):
+    """Pack cursor data (may hold ObjectId/datetime) into an opaque URL-safe token."""
+    raw = json_util.dumps(data).encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, **expected):
+    """
+    Reverse encode_cursor; returns None for anything malformed. A valid
+    cursor is a dict with "value" and an ObjectId "id", and every keyword
+    (kind="my_houses", sort="newest", ...) must match what the cursor was
+    issued for, so a cursor from one endpoint is rejected by another.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json_util.loads(urlsafe_b64decode(padded.encode()))
+    except Exception:
+        return None
+
+    if not isinstance(position, dict) or "value" not in position:
+        return None
+    if not isinstance(position.get("id"), ObjectId):
+        return None
+    if any(position.get(key) != value for key, value in expected.items()):
+        return None
+
+    return position
+
+
+def keyset_filter(field, direction, last_value, last_id):
+    """
+    Filter for the page after (last_value, last_id) when sorting by
+    (field, _id) in the given direction. Mongo sorts null/missing values
+    before everything else, and $lt/$gt never match them, so they get
+    their own clauses.
+    """
+    op = "$lt" if direction == DESCENDING else "$gt"
+
+    if last_value is None:
+        clauses = [{field: None, "_id": {op: last_id}}]
+        if direction != DESCENDING:
+            clauses.append({field: {"$ne": None}})
+        return {"$or": clauses}
+
+    clauses = [
+        {field: {op: last_value}},
+        {field: last_value, "_id": {op: last_id}},
+    ]
+    if direction == DESCENDING:
+        clauses.append({field: None})
+    return {"$or": clauses}
@@ -0,0 +1,97 @@
+# app/utils/query_stats.py
+from flask import g, has_request_context, current_app, request
+from pymongo import monitoring
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestQueryStats:
+    """Mongo commands issued while serving one Flask request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_command = None
+        self.slowest_ms = 0.0
+
+    def record(self, command_name, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+
+        if duration_ms >= self.slowest_ms:
+            self.slowest_command = command_name
+            self.slowest_ms = duration_ms
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """
+    Attributes every command to the request being served on this thread.
+
+    pymongo calls listeners synchronously on the thread that ran the
+    command, so flask.g is the right request's. Commands run outside a
+    request (CLI, background cache refreshes) are ignored.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    def _record(self, event):
+        if not has_request_context():
+            return
+
+        stats = g.get("db_stats")
+        if stats is not None:
+            stats.record(event.command_name, event.duration_micros / 1000)
+
+
+query_stats_listener = QueryStatsListener()
+
+
+def query_budget(max_queries):
+    """
+    Declare how many Mongo commands a route may issue. Enforced only when
+    app.config["TESTING"] is set, where going over fails the request.
+    Put it directly under @bp.route.
+    """
+    def decorator(fn):
+        fn.query_budget = max_queries
+        return fn
+    return decorator
+
+
+def init_query_stats(app):
+    @app.before_request
+    def start_query_stats():
+        g.db_stats = RequestQueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get("db_stats")
+        if stats is None:
+            return response
+
+        if app.debug:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.2f}"
+            if stats.slowest_command:
+                response.headers["X-DB-Slowest"] = f"{stats.slowest_command};{stats.slowest_ms:.2f}ms"
+
+        if app.config.get("TESTING"):
+            view = current_app.view_functions.get(request.endpoint)
+            budget = getattr(view, "query_budget", None)
+
+            if budget is not None and stats.count > budget:
+                raise QueryBudgetExceeded(
+                    f"{request.endpoint} issued {stats.count} Mongo commands "
+                    f"(budget {budget})"
+                )
+
+        return response
@@ -0,0 +1,87 @@
+# app/utils/search.py
+import re
+
+from pymongo import UpdateOne
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+MIN_PREFIX = 2
+MAX_PREFIX = 20
+
+# Stored search fields are internal; keep them out of API responses
+SEARCH_PROJECTION = {"search_prefixes": 0, "search_title": 0}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def stem(token):
+    """Light English suffix stripping: plurals, -ing and -ed."""
+    if len(token) <= 3:
+        return token
+
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+
+    for suffix in ("ing", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+
+    return token
+
+
+def edge_ngrams(token):
+    return {token[:i] for i in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1)}
+
+
+def prefixes_for(*texts):
+    """Every prefix of every token and its stem, so partial words still match."""
+    prefixes = set()
+    for text in texts:
+        for token in tokenize(text):
+            prefixes |= edge_ngrams(token)
+            prefixes |= edge_ngrams(stem(token))
+    return prefixes
+
+
+def search_fields(title, location, description):
+    """
+    Fields stored on a house document to back listing search.
+
+    search_prefixes indexes title, location and description; search_title is
+    the title-only subset used to rank title matches first.
+    """
+    return {
+        "search_prefixes": sorted(prefixes_for(title, location, description)),
+        "search_title": sorted(prefixes_for(title)),
+    }
+
+
+def reindex_houses(db, batch_size=500):
+    """Rewrite the stored search fields on every house; returns how many."""
+    ops = []
+    total = 0
+
+    for h in db.houses.find({}, {"title": 1, "location": 1, "description": 1}):
+        fields = search_fields(h.get("title"), h.get("location"), h.get("description"))
+        ops.append(UpdateOne({"_id": h["_id"]}, {"$set": fields}))
+        total += 1
+
+        if len(ops) >= batch_size:
+            db.houses.bulk_write(ops, ordered=False)
+            ops = []
+
+    if ops:
+        db.houses.bulk_write(ops, ordered=False)
+    return total
+
+
+def query_terms(text):
+    """Stemmed, de-duplicated query terms, each matched as a prefix."""
+    terms = []
+    for token in tokenize(text):
+        term = stem(token)[:MAX_PREFIX]
+        if len(term) >= MIN_PREFIX and term not in terms:
+            terms.append(term)
+    return terms
@@ -1,6 +1,141 @@
-﻿# tests/conftest.py
+# tests/conftest.py
 import sys
 import os
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from bson import ObjectId
+from pymongo import monitoring
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# No background job threads; tests call app.utils.jobs.drain() instead
+os.environ["JOB_WORKERS"] = "0"
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Records every Mongo command name issued by clients created after import."""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Must be registered before create_app() builds the MongoClient
+command_recorder = CommandRecorder()
+monitoring.register(command_recorder)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """In-process caches outlive a test's database; start every test cold."""
+    from app.utils.auth_helpers import user_cache
+    from app.utils.cache import agent_dashboard_cache, listing_cache
+    from app.utils.favorites import favorite_sets
+
+    caches = (user_cache, listing_cache, agent_dashboard_cache, favorite_sets)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+@pytest.fixture
+def app():
+    uri = os.getenv("TEST_MONGO_URI")
+    if not uri:
+        pytest.skip("TEST_MONGO_URI not set")
+
+    os.environ["MONGO_URI"] = uri
+
+    from app import create_app
+    from app.extensions import mongo
+    from app.migrations import upgrade
+
+    app = create_app()
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        upgrade(mongo.db, echo=lambda _: None)
+
+    yield app
+
+    with app.app_context():
+        mongo.cx.drop_database(mongo.db.name)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Insert a user and return (user, auth headers)."""
+    from app.extensions import mongo
+
+    def _make_user(role="haunter", **fields):
+        user = {
+            "username": f"{role}-{ObjectId()}",
+            "email": f"{ObjectId()}@test.com",
+            "password": "not-used",
+            "role": role,
+            "created_at": datetime.utcnow(),
+            **fields,
+        }
+
+        with app.app_context():
+            user["_id"] = mongo.db.users.insert_one(user).inserted_id
+
+        token = jwt.encode(
+            {"user_id": str(user["_id"]), "exp": datetime.utcnow() + timedelta(hours=1)},
+            app.config["SECRET_KEY"],
+            algorithm="HS256",
+        )
+
+        return user, {"Authorization": f"Bearer {token}"}
+
+    return _make_user
+
+
+@pytest.fixture
+def make_house(app):
+    """Insert an approved house for an agent and return its id."""
+    from app.extensions import mongo
+
+    def _make_house(agent, **fields):
+        house = {
+            "agent_id": agent["_id"],
+            "title": "Test house",
+            "description": "Test house",
+            "location": "Lekki",
+            "price": 1000.0,
+            "images": [],
+            "status": "approved",
+            "favorite_count": 0,
+            "created_at": datetime.utcnow(),
+            **fields,
+        }
+
+        with app.app_context():
+            return mongo.db.houses.insert_one(house).inserted_id
+
+    return _make_house
+
+
+@pytest.fixture
+def mongo_commands():
+    command_recorder.commands.clear()
+    return command_recorder.commands
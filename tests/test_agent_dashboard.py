@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+from app.extensions import mongo
+from app.utils.cache import agent_dashboard_cache
+
+
+def test_agent_dashboard_is_a_bounded_summary(app, client, make_user, make_house, mongo_commands):
+    agent, headers = make_user("agent")
+    haunter, _ = make_user("haunter")
+    now = datetime.utcnow()
+
+    house_ids = [
+        make_house(
+            agent, title=f"House {i}", status="approved" if i % 2 else "pending",
+            created_at=now - timedelta(minutes=i),
+        )
+        for i in range(12)
+    ]
+
+    with app.app_context():
+        mongo.db.contact_requests.insert_many([
+            {
+                "haunter_id": haunter["_id"], "agent_id": agent["_id"], "house_id": house_ids[0],
+                "status": "pending", "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(8)
+        ])
+
+    agent_dashboard_cache.clear()
+    mongo_commands.clear()
+    body = client.get("/api/dashboard/agent", headers=headers).get_json()
+
+    assert mongo_commands.count("aggregate") == 1
+    assert body["houses"]["total"] == 12
+    assert body["houses"]["by_status"] == {"approved": 6, "pending": 6}
+    assert [h["title"] for h in body["houses"]["recent"]] == [f"House {i}" for i in range(5)]
+    assert body["contact_requests"]["by_status"] == {"pending": 8}
+    assert len(body["contact_requests"]["recent"]) == 5
+    assert body["kyc"]["status"] == "not_submitted"
+
+    # Served from the per-agent cache on the next request
+    mongo_commands.clear()
+    client.get("/api/dashboard/agent", headers=headers)
+    assert "aggregate" not in mongo_commands
@@ -0,0 +1,149 @@
+import threading
+import time
+
+from app.utils.cache import TaggedCache, TTLCache
+
+
+def test_hit_and_miss_counters():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_delete_invalidates_entry():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.delete("a")
+
+    assert cache.get("a") is None
+
+
+def test_tagged_cache_serves_stale_while_one_refresh_runs():
+    cache = TaggedCache(ttl=0.01, stale_ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def refresh():
+        calls.append("refresh")
+        release.wait(5)
+        return "new"
+
+    cache.get_or_compute("k", lambda: "old")
+    time.sleep(0.02)
+
+    # Both stale reads return at once; only one refresh is started
+    assert cache.get_or_compute("k", lambda: "unused", refresh=refresh) == "old"
+    assert cache.get_or_compute("k", lambda: "unused", refresh=refresh) == "old"
+    assert cache.stats()["stale_hits"] == 2
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while cache.get_or_compute("k", lambda: "unused") != "new":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert calls == ["refresh"]
+
+
+def test_tagged_cache_concurrent_misses_compute_once():
+    cache = TaggedCache(ttl=60)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        for _ in range(5)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_tagged_cache_drops_results_computed_across_an_invalidation():
+    cache = TaggedCache(ttl=60)
+    cache.get_or_compute("a", lambda: 1, tags=("houses",))
+    cache.get_or_compute("b", lambda: 2, tags=("users",))
+
+    def compute():
+        # A write lands while this page is being computed
+        cache.invalidate_tag("houses")
+        return "before-write"
+
+    assert cache.get_or_compute("c", compute, tags=("houses",)) == "before-write"
+
+    assert cache.get_or_compute("c", lambda: "after-write") == "after-write"
+    assert cache.get_or_compute("a", lambda: "recomputed") == "recomputed"
+    assert cache.get_or_compute("b", lambda: "unused") == 2
+
+
+def test_update_patches_in_place_without_extending_ttl():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("a", frozenset({1}))
+    cache.update("missing", lambda ids: ids | {2})
+
+    time.sleep(0.03)
+    cache.update("a", lambda ids: ids | {2})
+    assert cache.get("a") == frozenset({1, 2})
+    assert cache.get("missing") is None
+
+    time.sleep(0.03)
+    assert cache.get("a") is None
+
+
+def test_concurrent_updates_are_not_lost():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", frozenset())
+
+    threads = [
+        threading.Thread(target=cache.update, args=("a", lambda ids, i=i: ids | {i}))
+        for i in range(50)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert cache.get("a") == frozenset(range(50))
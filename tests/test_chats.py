@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta
+
+from app.extensions import mongo
+
+
+def test_chat_list_puts_recently_active_chats_first(app, client, make_user):
+    agent, headers = make_user("agent")
+    now = datetime.utcnow()
+
+    with app.app_context():
+        old, new = (
+            mongo.db.chats.insert_one({
+                "agent_id": agent["_id"], "haunter_id": make_user("haunter")[0]["_id"],
+                "created_at": now - timedelta(days=days), "last_message_at": now - timedelta(days=days),
+            }).inserted_id
+            for days in (30, 1)
+        )
+
+    res = client.post(f"/api/chat/{old}/messages", json={"content": "still interested?"}, headers=headers)
+    assert res.status_code == 201
+
+    chats = client.get("/api/chat", headers=headers).get_json()["chats"]
+
+    assert [c["chat_id"] for c in chats] == [str(old), str(new)]
+    assert chats[0]["last_message"]["content"] == "still interested?"
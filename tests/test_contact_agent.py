@@ -0,0 +1,37 @@
+# Needs TEST_MONGO_URI to point at a replica set (transactions).
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.extensions import mongo
+
+
+def test_concurrent_contacts_never_overdraw(app, make_user, make_house):
+    haunter, headers = make_user("haunter")
+    agent, _ = make_user("agent")
+    house_id = make_house(agent, title="Stress Test House")
+
+    with app.app_context():
+        mongo.db.wallets.insert_one({
+            "user_id": haunter["_id"],
+            "balance": 10,
+            "updated_at": datetime.utcnow(),
+        })
+
+    def contact(_):
+        client = app.test_client()
+        return client.post(f"/api/haunter/contact-agent/{house_id}", headers=headers).status_code
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        statuses = list(pool.map(contact, range(40)))
+
+    # 10 credits at 2 per contact: exactly five may succeed
+    assert statuses.count(201) == 5
+    assert statuses.count(402) == 35
+
+    with app.app_context():
+        wallet = mongo.db.wallets.find_one({"user_id": haunter["_id"]})
+        assert wallet["balance"] == 0
+        assert wallet["credits_spent"] == 10
+        assert mongo.db.transactions.count_documents({"user_id": haunter["_id"]}) == 5
+        assert mongo.db.contact_requests.count_documents({"haunter_id": haunter["_id"]}) == 5
+        assert mongo.db.notifications.count_documents({"user_id": agent["_id"]}) == 5
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from app.extensions import mongo
+
+
+def insert_requests(app, make_house, agent, haunter, count, status="pending"):
+    now = datetime.utcnow()
+    house_id = make_house(agent, title="Inbox house")
+
+    with app.app_context():
+        mongo.db.contact_requests.insert_many([
+            {
+                "haunter_id": haunter["_id"],
+                "agent_id": agent["_id"],
+                "house_id": house_id,
+                "status": status,
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(count)
+        ])
+
+
+def test_inbox_pages_through_requests_by_status(app, client, make_user, make_house):
+    agent, headers = make_user("agent")
+    haunter, _ = make_user("haunter")
+    insert_requests(app, make_house, agent, haunter, 5, status="pending")
+    insert_requests(app, make_house, agent, haunter, 2, status="accepted")
+
+    seen = []
+    url = "/api/agent/contact-requests?status=pending&limit=2"
+    while url:
+        body = client.get(url, headers=headers).get_json()
+        seen += body["requests"]
+        url = body["next_cursor"] and f"/api/agent/contact-requests?status=pending&limit=2&cursor={body['next_cursor']}"
+
+    assert len(seen) == 5
+    assert {r["status"] for r in seen} == {"pending"}
+    assert seen[0]["haunter"]["username"] == haunter["username"]
+    assert seen[0]["house"]["title"] == "Inbox house"
+
+
+def test_decision_decrements_pending_badge_once(app, client, make_user, make_house):
+    agent, headers = make_user("agent")
+    haunter, _ = make_user("haunter")
+    insert_requests(app, make_house, agent, haunter, 2)
+
+    assert client.get("/api/agent/contact-requests/pending-count", headers=headers).get_json() == {"pending": 2}
+
+    request_id = client.get("/api/agent/contact-requests", headers=headers).get_json()["requests"][0]["request_id"]
+    url = f"/api/agent/contact-requests/{request_id}/decision"
+
+    assert client.post(url, json={"decision": "rejected"}, headers=headers).status_code == 200
+    assert client.post(url, json={"decision": "accepted"}, headers=headers).status_code == 409
+    assert client.get("/api/agent/contact-requests/pending-count", headers=headers).get_json() == {"pending": 1}
@@ -0,0 +1,70 @@
+from app.extensions import mongo
+
+
+def favorite_count(app, house_id):
+    with app.app_context():
+        return mongo.db.houses.find_one({"_id": house_id})["favorite_count"]
+
+
+def test_add_is_idempotent_and_counted(app, client, make_user, make_house):
+    agent, _ = make_user("agent")
+    _, headers = make_user("haunter")
+    house_id = make_house(agent)
+
+    assert client.post(f"/api/favorites/add/{house_id}", headers=headers).status_code == 201
+    assert client.post(f"/api/favorites/add/{house_id}", headers=headers).status_code == 200
+    assert favorite_count(app, house_id) == 1
+
+    favorites = client.get("/api/favorites/", headers=headers).get_json()["favorites"]
+    assert [f["house_id"] for f in favorites] == [str(house_id)]
+
+    res = client.delete(f"/api/favorites/remove/{favorites[0]['favorite_id']}", headers=headers)
+    assert res.status_code == 200
+    assert favorite_count(app, house_id) == 0
+
+    res = client.delete(f"/api/favorites/remove/{favorites[0]['favorite_id']}", headers=headers)
+    assert res.status_code == 404
+    assert favorite_count(app, house_id) == 0
+
+
+def test_popular_sort_orders_by_favorite_count(app, client, make_user, make_house):
+    agent, _ = make_user("agent")
+    quiet, loved = make_house(agent), make_house(agent)
+
+    for _ in range(2):
+        _, headers = make_user("haunter")
+        client.post(f"/api/favorites/add/{loved}", headers=headers)
+
+    res = client.get("/api/haunter/houses?sort=popular", headers=headers)
+
+    assert [h["id"] for h in res.get_json()["houses"]] == [str(loved), str(quiet)]
+
+
+def test_listing_and_check_report_favorites(app, client, make_user, make_house):
+    agent, _ = make_user("agent")
+    _, headers = make_user("haunter")
+    plain, liked = make_house(agent), make_house(agent)
+
+    client.get("/api/haunter/houses", headers=headers)  # load the favorite set
+    client.post(f"/api/favorites/add/{liked}", headers=headers)
+
+    houses = client.get("/api/haunter/houses", headers=headers).get_json()["houses"]
+    assert {h["id"]: h["is_favorite"] for h in houses} == {str(plain): False, str(liked): True}
+
+    res = client.post("/api/favorites/check", json={"house_ids": [str(plain), str(liked)]}, headers=headers)
+    assert res.get_json()["favorites"] == {str(plain): False, str(liked): True}
+
+
+def test_favoriting_refreshes_cached_popular_order(app, client, make_user, make_house):
+    agent, _ = make_user("agent")
+    _, headers = make_user("haunter")
+    first, second = make_house(agent), make_house(agent)
+    url = "/api/haunter/houses?sort=popular"
+
+    # Ties fall back to newest first, so the cached page starts with second
+    client.get(url, headers=headers)
+    client.post(f"/api/favorites/add/{first}", headers=headers)
+
+    houses = client.get(url, headers=headers).get_json()["houses"]
+    assert [h["id"] for h in houses] == [str(first), str(second)]
+    assert houses[0]["favorite_count"] == 1
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from app.extensions import mongo
+from app.utils.haunter_dashboard import build_dashboard
+
+
+def test_dashboard_is_built_once_then_maintained(app, client, make_user, make_house, mongo_commands):
+    agent, _ = make_user("agent")
+    haunter, headers = make_user("haunter")
+
+    house_id = make_house(agent, title="Old title")
+
+    with app.app_context():
+        mongo.db.contact_requests.insert_one({
+            "haunter_id": haunter["_id"], "agent_id": agent["_id"], "house_id": house_id,
+            "status": "pending", "created_at": datetime.utcnow(),
+        })
+
+    # First read builds the document
+    body = client.get("/api/dashboard/haunter", headers=headers).get_json()
+    assert body["total_requests"] == 1
+    assert body["requested_houses"][0]["title"] == "Old title"
+
+    client.post("/api/wallet/topup", json={}, headers=headers)
+    client.post("/api/review", json={"agent_id": str(agent["_id"]), "rating": 4}, headers=headers)
+
+    mongo_commands.clear()
+    body = client.get("/api/dashboard/haunter", headers=headers).get_json()
+
+    assert mongo_commands.count("find") <= 2  # token user (maybe cached) + dashboard
+    assert body["wallet"]["balance"] == 100000
+    assert body["total_reviews"] == 1
+    assert body["reviews_written"][0]["rating"] == 4
+
+    # Incremental updates agree with a full rebuild
+    with app.app_context():
+        stored = mongo.db.haunter_dashboards.find_one({"_id": haunter["_id"]})
+        rebuilt = build_dashboard(haunter["_id"])
+
+    for field in ("total_requests", "total_reviews", "recent_requests", "wallet"):
+        assert stored[field] == rebuilt[field]
+
+
+def test_deleted_house_stays_counted_and_matches_rebuild(app, client, make_user, make_house):
+    agent, agent_headers = make_user("agent")
+    haunter, headers = make_user("haunter")
+
+    house_id = make_house(agent, title="Gone soon")
+
+    with app.app_context():
+        mongo.db.contact_requests.insert_one({
+            "haunter_id": haunter["_id"], "agent_id": agent["_id"], "house_id": house_id,
+            "status": "pending", "created_at": datetime.utcnow(),
+        })
+
+    client.get("/api/dashboard/haunter", headers=headers)
+    assert client.delete(f"/api/agent/delete-house/{house_id}", headers=agent_headers).status_code == 200
+
+    body = client.get("/api/dashboard/haunter", headers=headers).get_json()
+    assert body["total_requests"] == 1
+    assert body["requested_houses"][0]["title"] is None
+
+    with app.app_context():
+        stored = mongo.db.haunter_dashboards.find_one({"_id": haunter["_id"]})
+        rebuilt = build_dashboard(haunter["_id"])
+
+    assert stored["total_requests"] == rebuilt["total_requests"]
+    assert stored["recent_requests"] == rebuilt["recent_requests"]
+
+
+def test_write_during_first_build_is_not_lost(app, make_user, make_house, monkeypatch):
+    from app.utils import haunter_dashboard
+    from app.utils.haunter_dashboard import get_dashboard, record_contact_request, request_entry
+
+    agent, _ = make_user("agent")
+    haunter, _ = make_user("haunter")
+    house_id = make_house(agent, title="Raced")
+    compute = haunter_dashboard.compute_dashboard
+    calls = []
+
+    def compute_then_write(haunter_id):
+        dashboard = compute(haunter_id)
+        if not calls:
+            # contact_agent lands after the snapshot was read, before it is stored
+            now = datetime.utcnow()
+            request_id = mongo.db.contact_requests.insert_one({
+                "haunter_id": haunter_id, "agent_id": agent["_id"], "house_id": house_id,
+                "status": "pending", "created_at": now,
+            }).inserted_id
+            house = mongo.db.houses.find_one({"_id": house_id})
+            record_contact_request(haunter_id, request_entry(request_id, house, now))
+        calls.append(haunter_id)
+        return dashboard
+
+    monkeypatch.setattr(haunter_dashboard, "compute_dashboard", compute_then_write)
+
+    with app.app_context():
+        dashboard = get_dashboard(haunter["_id"])
+        stored = mongo.db.haunter_dashboards.find_one({"_id": haunter["_id"]})
+
+    # The first snapshot missed the request, so it was recomputed
+    assert len(calls) == 2
+    assert dashboard["total_requests"] == stored["total_requests"] == 1
+    assert not stored.get("pending")
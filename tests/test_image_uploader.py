@@ -0,0 +1,78 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.utils.image_uploader import ImageUploader, upload_house_images
+
+
+class FakeUploader(ImageUploader):
+    """Local stand-in for Cloudinary with adjustable per-file latency."""
+
+    def __init__(self, latency=0.0, fail=()):
+        self.latency = latency
+        self.fail = set(fail)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def upload(self, file, public_id, timeout=None):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+        try:
+            delay = self.latency(file) if callable(self.latency) else self.latency
+            time.sleep(delay)
+
+            if file.filename in self.fail:
+                raise RuntimeError("storage unavailable")
+
+            return f"https://images.test/{public_id}/{file.filename}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_files(count):
+    return [SimpleNamespace(filename=f"{i}.jpg") for i in range(count)]
+
+
+def test_urls_keep_upload_order():
+    files = make_files(5)
+    # Earlier files finish last
+    uploader = FakeUploader(latency=lambda f: 0.05 * (5 - int(f.filename[0])))
+
+    urls, failures = upload_house_images(files, "agent", uploader=uploader)
+
+    assert failures == []
+    assert [u.rsplit("/", 1)[1] for u in urls] == [f.filename for f in files]
+
+
+def test_uploads_run_concurrently_within_pool_bound():
+    uploader = FakeUploader(latency=0.2)
+
+    started = time.monotonic()
+    urls, _ = upload_house_images(make_files(8), "agent", uploader=uploader, max_workers=4)
+    elapsed = time.monotonic() - started
+
+    assert len(urls) == 8
+    assert uploader.peak == 4
+    assert elapsed < 0.8
+
+
+def test_partial_failures_are_reported():
+    uploader = FakeUploader(fail={"1.jpg"})
+
+    urls, failures = upload_house_images(make_files(3), "agent", uploader=uploader)
+
+    assert len(urls) == 2
+    assert failures == [{"filename": "1.jpg", "error": "storage unavailable"}]
+
+
+def test_slow_uploads_time_out():
+    uploader = FakeUploader(latency=lambda f: 1.0 if f.filename == "0.jpg" else 0.0)
+
+    urls, failures = upload_house_images(make_files(2), "agent", uploader=uploader, timeout=0.2)
+
+    assert len(urls) == 1
+    assert failures == [{"filename": "0.jpg", "error": "Upload timed out"}]
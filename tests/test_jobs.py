@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from app.extensions import mongo
+from app.utils import jobs
+
+
+def test_failing_job_is_retried_then_dead_lettered(app):
+    calls = []
+
+    @jobs.job("test-always-fails")
+    def always_fails(payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    with app.app_context():
+        job_id = jobs.enqueue("test-always-fails", {"n": 1}, max_attempts=3)
+
+        now = datetime.utcnow()
+        for _ in range(3):
+            assert jobs.drain(now=now) == 1
+            # Nothing is due again until the backoff has passed
+            assert jobs.drain(now=now) == 0
+            now += timedelta(seconds=jobs.BACKOFF_MAX * 2)
+
+        doc = mongo.db.jobs.find_one({"_id": job_id})
+        assert doc["status"] == "dead"
+        assert doc["attempts"] == 3
+        assert "boom" in doc["last_error"]
+        assert len(calls) == 3
+
+
+def test_idempotency_key_enqueues_once(app):
+    ran = []
+
+    @jobs.job("test-records")
+    def records(payload):
+        ran.append(payload["n"])
+
+    with app.app_context():
+        first = jobs.enqueue("test-records", {"n": 1}, idempotency_key="k")
+        second = jobs.enqueue("test-records", {"n": 2}, idempotency_key="k")
+
+        assert first == second
+        assert jobs.drain() == 1
+        assert ran == [1]
+        assert mongo.db.jobs.find_one({"_id": first})["status"] == "done"
+
+
+def test_enqueue_retries_when_the_conflicting_job_vanishes(app, monkeypatch):
+    from pymongo.collection import Collection
+
+    find_one = Collection.find_one
+    removed = []
+
+    def cleanup_first(self, *args, **kwargs):
+        # A cleanup deletes the conflicting job just before the lookup
+        if self.name == "jobs" and not removed:
+            removed.append(self.delete_many({"idempotency_key": "k"}).deleted_count)
+        return find_one(self, *args, **kwargs)
+
+    with app.app_context():
+        jobs.enqueue("test-records", {"n": 1}, idempotency_key="k")
+        monkeypatch.setattr(Collection, "find_one", cleanup_first)
+
+        job_id = jobs.enqueue("test-records", {"n": 2}, idempotency_key="k")
+
+        assert removed == [1]
+        assert mongo.db.jobs.find_one({"_id": job_id})["payload"] == {"n": 2}
+
+
+def test_forgot_password_returns_without_sending(app, client, make_user, monkeypatch):
+    monkeypatch.setenv("FRONTEND_URL", "http://localhost")
+    monkeypatch.setenv("RESEND_API_KEY", "key")
+    monkeypatch.setenv("EMAIL_FROM", "noreply@test.com")
+
+    user, _ = make_user("haunter")
+
+    res = client.post("/api/auth/forgot-password", json={"email": user["email"]})
+
+    assert res.status_code == 200
+    with app.app_context():
+        job = mongo.db.jobs.find_one({"name": "send_resend_email"})
+        assert job["status"] == "queued"
+        assert job["payload"]["to"] == [user["email"]]
+
+
+def test_repeated_forgot_password_queues_one_email(app, client, make_user, monkeypatch):
+    monkeypatch.setenv("FRONTEND_URL", "http://localhost")
+    monkeypatch.setenv("RESEND_API_KEY", "key")
+    monkeypatch.setenv("EMAIL_FROM", "noreply@test.com")
+    monkeypatch.setattr("app.routes.auth.RESET_EMAIL_WINDOW", 10**9)  # one window
+
+    user, _ = make_user("haunter")
+
+    for _ in range(3):
+        client.post("/api/auth/forgot-password", json={"email": user["email"]})
+
+    with app.app_context():
+        assert mongo.db.jobs.count_documents({"name": "send_resend_email"}) == 1
@@ -0,0 +1,59 @@
+from app.utils.cache import listing_cache
+
+
+def insert_houses(make_house, agents, count):
+    for i in range(count):
+        make_house(agents[i % len(agents)], title=f"House {i}", price=float(1000 + i))
+
+
+def count_listing_commands(client, url, headers, mongo_commands):
+    listing_cache.clear()
+    mongo_commands.clear()
+    res = client.get(url, headers=headers)
+    assert res.status_code == 200
+    return len(mongo_commands)
+
+
+def test_haunter_listing_query_count_is_constant(client, make_user, make_house, mongo_commands):
+    agents = [make_user("agent")[0] for _ in range(5)]
+    _, headers = make_user("haunter")
+    url = "/api/haunter/houses?limit=100"
+
+    insert_houses(make_house, agents, 3)
+    client.get(url, headers=headers)  # warm the user cache
+
+    small = count_listing_commands(client, url, headers, mongo_commands)
+
+    insert_houses(make_house, agents, 40)
+    large = count_listing_commands(client, url, headers, mongo_commands)
+
+    assert small == large
+
+
+def test_wallet_listing_query_count_is_constant(client, make_user, make_house, mongo_commands):
+    agents = [make_user("agent")[0] for _ in range(5)]
+    _, headers = make_user("haunter")
+    url = "/api/wallet/houses"
+
+    insert_houses(make_house, agents, 3)
+    client.get(url, headers=headers)
+
+    small = count_listing_commands(client, url, headers, mongo_commands)
+
+    insert_houses(make_house, agents, 40)
+    large = count_listing_commands(client, url, headers, mongo_commands)
+
+    assert small == large
+
+
+def test_listing_queries_count_toward_the_request(app, client, make_user, make_house):
+    agents = [make_user("agent")[0] for _ in range(2)]
+    _, headers = make_user("haunter")
+    insert_houses(make_house, agents, 3)
+
+    app.debug = True
+    listing_cache.clear()
+    res = client.get("/api/haunter/houses", headers=headers)
+
+    # user + houses + agent names + favorite set, all in this request's stats
+    assert int(res.headers["X-DB-Query-Count"]) == 4
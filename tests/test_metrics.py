@@ -0,0 +1,27 @@
+from app.utils.metrics import Registry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", ["endpoint"], buckets=(0.1, 1))
+
+    latency.observe(0.05, endpoint="a")
+    latency.observe(0.5, endpoint="a")
+    latency.observe(5, endpoint="a")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{endpoint="a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{endpoint="a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{endpoint="a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{endpoint="a"} 3' in lines
+
+
+def test_metrics_endpoint_requires_admin(client, make_user):
+    _, headers = make_user("haunter")
+    assert client.get("/api/metrics", headers=headers).status_code == 403
+
+    _, headers = make_user("admin")
+    res = client.get("/api/metrics", headers=headers)
+
+    assert res.status_code == 200
+    assert b"http_request_duration_seconds_bucket" in res.data
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from app.extensions import mongo
+from app.migrations import MIGRATIONS, applied_versions, upgrade
+
+
+def test_every_migration_is_recorded_once(app):
+    with app.app_context():
+        # The app fixture has already upgraded this database
+        assert applied_versions(mongo.db) == {version for version, _, _ in MIGRATIONS}
+        assert upgrade(mongo.db, echo=lambda _: None) == 0
+
+        assert mongo.db.users.count_documents({"role": "admin"}) == 1
+
+
+def test_versions_are_unique():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert len(versions) == len(set(versions))
+
+
+def test_app_boot_issues_no_writes(app, mongo_commands):
+    from app import create_app
+
+    create_app()
+
+    assert not {"createIndexes", "insert", "update"} & set(mongo_commands)
+
+
+def test_unread_counter_backfill_keeps_existing_notifications(app, make_user):
+    from app.migrations import notification_unread_counters
+    from app.utils.notify import create_notification, get_unread_count
+
+    user, _ = make_user("haunter")
+
+    with app.app_context():
+        # Five unread notifications from before the counter existed
+        mongo.db.notifications.insert_many([
+            {"user_id": user["_id"], "message": f"old {i}", "is_read": False}
+            for i in range(5)
+        ])
+        notification_unread_counters(mongo.db)
+
+        create_notification(user["_id"], "new")
+
+        assert get_unread_count(user["_id"]) == 6
+
+
+def test_search_backfill_makes_old_houses_searchable(app, client, make_user):
+    from app.migrations import house_search_fields
+
+    agent, _ = make_user("agent")
+    _, headers = make_user("haunter")
+
+    with app.app_context():
+        # Stored before search fields existed
+        mongo.db.houses.insert_one({
+            "agent_id": agent["_id"], "title": "Quiet bungalow", "location": "Surulere",
+            "price": 900.0, "status": "approved", "created_at": datetime.utcnow(),
+        })
+        house_search_fields(mongo.db)
+
+    houses = client.get("/api/haunter/houses?search=bungal", headers=headers).get_json()["houses"]
+
+    assert [h["title"] for h in houses] == ["Quiet bungalow"]
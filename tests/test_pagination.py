@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.extensions import mongo
+from app.utils.cache import listing_cache
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+BAD_CURSORS = [
+    "not-base64!",
+    encode_cursor([]),
+    encode_cursor("x"),
+    encode_cursor(1),
+    encode_cursor({}),
+    encode_cursor({"value": 1}),
+    encode_cursor({"value": 1, "id": "not-an-objectid"}),
+]
+
+
+@pytest.mark.parametrize("cursor", BAD_CURSORS)
+def test_decode_cursor_rejects_malformed(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def test_decode_cursor_round_trips_and_checks_expected_keys():
+    oid = ObjectId()
+    cursor = encode_cursor({"kind": "houses", "sort": "newest", "value": None, "id": oid})
+
+    assert decode_cursor(cursor, kind="houses", sort="newest")["id"] == oid
+    assert decode_cursor(cursor, kind="houses", sort="price_asc") is None
+    assert decode_cursor(cursor, kind="my_houses") is None
+
+
+@pytest.mark.parametrize("url", [
+    "/api/haunter/houses?cursor={}",
+    "/api/agent/my-houses?cursor={}",
+    "/api/agent/contact-requests?cursor={}",
+    "/api/notifications/?cursor={}",
+])
+@pytest.mark.parametrize("cursor", BAD_CURSORS[1:])
+def test_invalid_cursor_is_a_400(client, make_user, url, cursor):
+    role = "haunter" if url.startswith("/api/haunter") else "agent"
+    _, headers = make_user(role)
+
+    res = client.get(url.format(cursor), headers=headers)
+
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "Invalid cursor"
+
+
+def test_cursor_from_another_endpoint_is_rejected(app, client, make_user, make_house):
+    agent, headers = make_user("agent")
+    haunter, _ = make_user("haunter")
+    house_id = make_house(agent)
+
+    with app.app_context():
+        mongo.db.contact_requests.insert_many([
+            {"haunter_id": haunter["_id"], "agent_id": agent["_id"], "house_id": house_id,
+             "status": "pending", "created_at": datetime.utcnow()}
+            for _ in range(2)
+        ])
+
+    cursor = client.get("/api/agent/contact-requests?limit=1", headers=headers).get_json()["next_cursor"]
+
+    res = client.get(f"/api/agent/my-houses?cursor={cursor}", headers=headers)
+    assert res.status_code == 400
+
+
+def walk(client, headers, url):
+    ids, cursor = [], None
+    while True:
+        listing_cache.clear()
+        res = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+        assert res.status_code == 200
+        body = res.get_json()
+        ids += [h["id"] for h in body["houses"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("sort", ["price_asc", "price_desc", "popular"])
+def test_pages_cover_null_and_missing_values_once(app, client, make_user, sort):
+    agent, _ = make_user("agent")
+    _, headers = make_user("haunter")
+
+    with app.app_context():
+        docs = []
+        for i in range(7):
+            doc = {
+                "agent_id": agent["_id"], "title": f"House {i}", "location": "Lekki",
+                "status": "approved", "created_at": datetime.utcnow(),
+            }
+            # Legacy rows: a null price, a missing price, repeated values
+            if i % 3 == 0:
+                doc["price"] = None
+            elif i % 3 == 1:
+                doc["price"] = float(1000 + i // 2)
+                doc["favorite_count"] = i // 2
+            docs.append(doc)
+        inserted = mongo.db.houses.insert_many(docs, bypass_document_validation=True)
+
+    ids = walk(client, headers, f"/api/haunter/houses?sort={sort}&limit=2")
+
+    assert sorted(ids) == sorted(str(oid) for oid in inserted.inserted_ids)
+
+
+def test_notifications_page_newest_first(app, client, make_user):
+    user, headers = make_user("haunter")
+    now = datetime.utcnow()
+
+    with app.app_context():
+        mongo.db.notifications.insert_many([
+            {"user_id": user["_id"], "message": f"n{i}", "is_read": False,
+             "created_at": now - timedelta(minutes=i)}
+            for i in range(5)
+        ])
+
+    messages, url = [], "/api/notifications/?limit=2"
+    while url:
+        body = client.get(url, headers=headers).get_json()
+        messages += [n["message"] for n in body["notifications"]]
+        url = body["next_cursor"] and f"/api/notifications/?limit=2&cursor={body['next_cursor']}"
+
+    assert messages == [f"n{i}" for i in range(5)]
@@ -0,0 +1,41 @@
+import pytest
+
+from app.extensions import mongo
+from app.utils.query_stats import query_budget, QueryBudgetExceeded
+
+
+def test_route_over_budget_fails_in_testing(app):
+    @app.route("/_test/n-plus-one")
+    @query_budget(2)
+    def n_plus_one():
+        for _ in range(3):
+            mongo.db.users.find_one({})
+        return "", 204
+
+    with pytest.raises(QueryBudgetExceeded):
+        app.test_client().get("/_test/n-plus-one")
+
+
+def test_route_within_budget_passes(app):
+    @app.route("/_test/single-query")
+    @query_budget(1)
+    def single_query():
+        mongo.db.users.find_one({})
+        return "", 204
+
+    assert app.test_client().get("/_test/single-query").status_code == 204
+
+
+def test_debug_mode_exposes_query_headers(app):
+    app.debug = True
+
+    @app.route("/_test/headers")
+    def headers():
+        mongo.db.users.find_one({})
+        return "", 204
+
+    res = app.test_client().get("/_test/headers")
+
+    assert res.headers["X-DB-Query-Count"] == "1"
+    assert "X-DB-Time-Ms" in res.headers
+    assert res.headers["X-DB-Slowest"].startswith("find;")
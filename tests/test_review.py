@@ -0,0 +1,17 @@
+import pytest
+
+from app.routes.review import parse_rating
+
+
+@pytest.mark.parametrize("value, expected", [
+    (4, 4), (1, 1), (5, 5), (4.0, 4), ("4", 4), (" 3 ", 3),
+])
+def test_whole_star_ratings_are_accepted(value, expected):
+    assert parse_rating(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    4.7, "4.7", True, False, 0, 6, -1, "", "four", None, [4], float("nan"), float("inf"),
+])
+def test_other_ratings_are_rejected(value):
+    assert parse_rating(value) is None
@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+import socketio as socketio_client
+
+from app.sockets.broker import UnixSocketBroker
+
+ROOM = "chat-room"
+
+
+def make_socketio(path, async_mode):
+    from flask import Flask
+    from flask_socketio import SocketIO, join_room
+    from app.sockets.broker import UnixSocketManager
+
+    app = Flask(__name__)
+    sio = SocketIO(app, async_mode=async_mode, client_manager=UnixSocketManager(path))
+
+    @sio.on("connect")
+    def on_connect():
+        join_room(ROOM)
+
+    return app, sio
+
+
+def run_server(path, async_mode, port):
+    """Worker B: a real Socket.IO server the test connects a client to."""
+    app, sio = make_socketio(path, async_mode)
+    sio.run(app, host="127.0.0.1", port=port, allow_unsafe_werkzeug=True)
+
+
+def run_emitter(path, async_mode, stop):
+    """Worker A: emits into the room until the test says the message arrived."""
+    app, sio = make_socketio(path, async_mode)
+
+    while not stop.is_set():
+        sio.emit("receive_message", {"content": "hello from A"}, room=ROOM)
+        sio.sleep(0.1)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def connect(client, url, timeout=15):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            client.connect(url, wait_timeout=5)
+            return
+        except socketio_client.exceptions.ConnectionError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+@pytest.fixture
+def broker():
+    # Unix socket paths are length-limited, so keep this short
+    workdir = tempfile.mkdtemp(prefix="sio")
+    broker = UnixSocketBroker(os.path.join(workdir, "b.sock"))
+    broker.bind()
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+
+    yield broker
+
+    broker.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+@pytest.mark.parametrize("async_mode", ["threading", "eventlet"])
+def test_emit_on_one_worker_reaches_client_on_another(broker, async_mode):
+    ctx = multiprocessing.get_context("spawn")
+    port = free_port()
+    stop = ctx.Event()
+
+    server = ctx.Process(target=run_server, args=(broker.path, async_mode, port), daemon=True)
+    emitter = ctx.Process(target=run_emitter, args=(broker.path, async_mode, stop), daemon=True)
+
+    received = []
+    arrived = threading.Event()
+    client = socketio_client.Client()
+
+    @client.on("receive_message")
+    def on_message(data):
+        received.append(data)
+        arrived.set()
+
+    server.start()
+    try:
+        connect(client, f"http://127.0.0.1:{port}")
+        emitter.start()
+        assert arrived.wait(15)
+    finally:
+        stop.set()
+        client.disconnect()
+        for worker in (emitter, server):
+            if worker.pid is not None:
+                worker.terminate()
+                worker.join(5)
+
+    assert received[0] == {"content": "hello from A"}